@@ -3,6 +3,7 @@ from pathlib import Path
 from tools.search       import search_records
 from tools.read         import read_records
 from tools.read_format  import format_search_results
+from tools.token_index  import tokens_for_matches
 from tools.flagger      import Flagger
 from utils.config       import load_settings
 
@@ -21,7 +22,8 @@ def main():
     logging.debug(f"[DEBUG] Search package: {pkg}")
     matches = search_records(pkg, conn, db_type, flagger)
     records = read_records(pkg, conn, db_type)
-    output  = format_search_results(matches, records)
+    tokens  = tokens_for_matches(conn, db_type, matches)
+    output  = format_search_results(matches, records, tokens=tokens)
 
     print(output)
 
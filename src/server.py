@@ -0,0 +1,168 @@
+import argparse
+import json
+import logging
+import os
+import socketserver
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from tools.batch               import log_batch, process_batch
+from tools.create              import create_records
+from tools.delete              import delete_records
+from tools.flagger             import Flagger, FlaggedError
+from tools.plan                import prepare_search
+from tools.read                import read_records
+from tools.report              import build_report
+from tools.schema_introspect   import enable_schema_cache, check_schema_version
+from tools.update              import update_records
+from tools.validate            import check_batch, validate_records
+from utils.config              import get_server_settings
+from utils.connect             import ConnectionPool
+from utils.types               import ReportPackage
+
+# --- request handlers: (body, conn, db_type, flagger) -> JSON-able result ---
+
+def _expect(body, key, kind, items=None):
+    # Body shape errors become 400 INVALID_PACKAGE instead of a TypeError deep in a tool
+    value = body[key]
+    if not isinstance(value, kind) or (items and not all(isinstance(v, items) for v in value)):
+        expected = kind.__name__ + (f" of {items.__name__}" if items else "")
+        raise ValueError(f"'{key}' must be a {expected}")
+    return value
+
+def _search(body, conn, db_type, flagger):
+    # Same-shaped packages reuse one compiled plan; values arrive in "params"
+    plan = prepare_search(body, conn, db_type, flagger)
+    return {"uuids": plan.execute(conn, body.get("params", {}), flagger)}
+
+def _read(body, conn, db_type, flagger):
+    pkg = SimpleNamespace(filters=_expect(body, "tables", list, str), uuids=_expect(body, "uuids", list))
+    return read_records(pkg, conn, db_type, flagger)
+
+def _report(body, conn, db_type, flagger):
+    return build_report(ReportPackage.from_dict(body), conn, db_type, flagger)
+
+def _crud(fn, kind):
+    def handler(body, conn, db_type, flagger):
+        pkg = SimpleNamespace(table=_expect(body, "table", str), records=_expect(body, "records", list))
+        # The whole payload is checked before the first statement runs
+        validate_records(kind, pkg.table, pkg.records, conn, db_type, flagger)
+        # Logged like a one-group batch so saved searches and working copies see it
+        batch_id = str(uuid.uuid4())
+        result = fn(pkg, conn, db_type, flagger, batch_id=batch_id)
+        log_batch(conn, db_type, batch_id)
+        conn.commit()
+        return result
+    return handler
+
+def _batch(body, conn, db_type, flagger):
+    return process_batch(SimpleNamespace(groups=_expect(body, "groups", dict)), conn, db_type, flagger)
+
+def _validate(body, conn, db_type, flagger):
+    report = check_batch(SimpleNamespace(groups=_expect(body, "groups", dict)), conn, db_type)
+    return {"valid": report.valid, "errors": report.get_errors(), "warnings": report.get_warnings()}
+
+ROUTES = {
+    "/search":   _search,
+    "/read":     _read,
+    "/report":   _report,
+    "/create":   _crud(create_records, "create"),
+    "/update":   _crud(update_records, "update"),
+    "/delete":   _crud(delete_records, "delete"),
+    "/batch":    _batch,
+    "/validate": _validate,
+}
+
+class QueryHandler(BaseHTTPRequestHandler):
+    pool: ConnectionPool = None
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, {"ok": True})
+        else:
+            self._reply(404, {"ok": False, "error": "UNKNOWN_ROUTE", "context": {"path": self.path}})
+
+    def do_POST(self):
+        route = ROUTES.get(self.path)
+        if route is None:
+            self._reply(404, {"ok": False, "error": "UNKNOWN_ROUTE", "context": {"path": self.path}})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._reply(400, {"ok": False, "error": "INVALID_JSON", "context": {"detail": str(e)}})
+            return
+
+        if not isinstance(body, dict):
+            self._reply(400, {"ok": False, "error": "INVALID_PACKAGE",
+                              "context": {"detail": f"Body must be a JSON object, not {type(body).__name__}"}})
+            return
+
+        flagger = Flagger()
+        try:
+            with self.pool.acquire() as conn:
+                check_schema_version(conn, self.pool.db_type)
+                result = route(body, conn, self.pool.db_type, flagger)
+            self._reply(200, {"ok": True, "result": result, "warnings": flagger.get_warnings()})
+        except FlaggedError as e:
+            self._reply(400, {"ok": False, "error": e.code, "context": e.context})
+        except (KeyError, ValueError) as e:
+            self._reply(400, {"ok": False, "error": "INVALID_PACKAGE", "context": {"detail": str(e)}})
+        except Exception as e:
+            logging.exception("[ERROR] Request failed")
+            self._reply(500, {"ok": False, "error": "INTERNAL_ERROR", "context": {"detail": str(e)}})
+
+    def _reply(self, status: int, payload: dict):
+        data = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        logging.debug(f"[DEBUG] {self.address_string()} {format % args}")
+
+class UnixQueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def serve(host: str = None, port: int = None, socket_path: str = None, pool_size: int = None):
+    settings = get_server_settings()
+    enable_schema_cache()
+    QueryHandler.pool = ConnectionPool(pool_size or settings["pool_size"])
+
+    socket_path = socket_path or settings["socket"]
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixQueryServer(socket_path, QueryHandler)
+        logging.info(f"[INFO] Serving on unix socket {socket_path}")
+    else:
+        server = ThreadingHTTPServer((host or settings["host"], port or settings["port"]), QueryHandler)
+        logging.info(f"[INFO] Serving on http://{server.server_address[0]}:{server.server_address[1]}")
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        QueryHandler.pool.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running query server")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--socket", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--pool-size", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    serve(args.host, args.port, args.socket, args.pool_size)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import sqlite3
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import utils.config as config
+import tools.schema_introspect as schema_introspect
+
+SCHEMA = [
+    "CREATE TABLE Contact (digitalID TEXT PRIMARY KEY, fullName TEXT, email TEXT, tags TEXT, age INTEGER)",
+    "CREATE TABLE Orders (digitalID TEXT PRIMARY KEY, city TEXT, total REAL)",
+    "CREATE TABLE field_log (batch_id TEXT, record_uuid TEXT, table_name TEXT, field_name TEXT, "
+    "old_value TEXT, new_value TEXT)",
+]
+CITIES = ["Paris", "Rome", "Oslo"]
+
+def ident(i: int) -> str:
+    return str(uuid.UUID(int=i + 1))
+
+def populate(conn, rows: int = 20) -> list[str]:
+    for stmt in SCHEMA:
+        conn.execute(stmt)
+    ids = []
+    for i in range(rows):
+        u = ident(i)
+        ids.append(u)
+        conn.execute("INSERT INTO Contact VALUES (?, ?, ?, ?, ?)", (
+            u, f"Name{i}", f"user{i}@{'x' if i % 2 else 'y'}.com",
+            "a;b" if i % 3 else "c;a_b", 20 + i % 5
+        ))
+        conn.execute("INSERT INTO Orders VALUES (?, ?, ?)", (u, CITIES[i % 3], i * 1.5))
+    conn.commit()
+    return ids
+
+@pytest.fixture
+def settings(monkeypatch, tmp_path):
+    data = {
+        "database_type": "sqlite",
+        "primary_identifier": "digitalID",
+        "connection": {"path": str(tmp_path / "test.db")},
+        "token_index": []
+    }
+    monkeypatch.setattr(config, "_settings", data)
+    monkeypatch.setattr(schema_introspect, "_schema_cache", None)
+    return data
+
+@pytest.fixture
+def db(settings):
+    conn = sqlite3.connect(":memory:")
+    ids = populate(conn)
+    yield conn, ids
+    conn.close()
+
+@pytest.fixture
+def file_db(settings):
+    conn = sqlite3.connect(settings["connection"]["path"])
+    ids = populate(conn)
+    conn.close()
+    return settings["connection"]["path"], ids
@@ -0,0 +1,94 @@
+import asyncio
+import sqlite3
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tools.async_api import AsyncEngine
+from tools.flagger import Flagger
+from tools.search import search_records
+from utils.connect import get_connection
+
+FILTERS = {
+    "Contact": [
+        {"field": "email", "operator": "ends", "value": "x.com"},
+        {"field": "age", "operator": "equals", "value": 21, "logic": "nand"},
+        {"field": "tags", "operator": "contains", "value": "c", "logic": "or"},
+    ],
+    "Orders": [{"field": "city", "operator": "equals", "value": "Paris", "logic": "nor"}],
+}
+
+def test_async_search_matches_sync(file_db):
+    pkg = SimpleNamespace(filters=FILTERS)
+    conn = get_connection()
+    expected = search_records(pkg, conn, "sqlite", Flagger())
+    conn.close()
+
+    async def run():
+        engine = AsyncEngine(pool_size=3)
+        try:
+            return await engine.search_records(pkg, Flagger())
+        finally:
+            await engine.close()
+
+    assert asyncio.run(run()) == expected
+
+@pytest.fixture
+def slow_db(file_db):
+    # LIKE backtracks on long runs of zeros: ~10s uninterrupted, interruptible per row
+    path, ids = file_db
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Slow (digitalID TEXT PRIMARY KEY, body TEXT)")
+    conn.execute("""
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100)
+        INSERT INTO Slow SELECT i, hex(zeroblob(100000)) FROM n
+    """)
+    conn.commit()
+    conn.close()
+    return path, ids
+
+SLOW = SimpleNamespace(filters={"Slow": [{"field": "body", "operator": "contains", "value": "0" * 300 + "1"}]})
+
+def _orders(ids):
+    return SimpleNamespace(filters=["Orders"], uuids=[ids[0]])
+
+def test_timeout_interrupts_query_and_frees_connection(slow_db):
+    _, ids = slow_db
+
+    async def run():
+        # One connection: the read can only run once the timed-out query has stopped
+        engine = AsyncEngine(pool_size=1)
+        try:
+            start = time.monotonic()
+            with pytest.raises(asyncio.TimeoutError):
+                await engine.search_records(SLOW, Flagger(), timeout=0.2)
+            rows = await engine.read_records(_orders(ids), timeout=5)
+            return rows, time.monotonic() - start
+        finally:
+            await engine.close()
+
+    rows, elapsed = asyncio.run(run())
+    assert rows[ids[0]]["Orders"]["city"] == "Paris"
+    assert elapsed < 3
+
+def test_cancel_interrupts_query_and_frees_connection(slow_db):
+    _, ids = slow_db
+
+    async def run():
+        engine = AsyncEngine(pool_size=1)
+        try:
+            task = asyncio.create_task(engine.search_records(SLOW, Flagger()))
+            await asyncio.sleep(0.3)
+            start = time.monotonic()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            rows = await engine.read_records(_orders(ids), timeout=5)
+            return rows, time.monotonic() - start
+        finally:
+            await engine.close()
+
+    rows, elapsed = asyncio.run(run())
+    assert rows[ids[0]]["Orders"]["city"] == "Paris"
+    assert elapsed < 3
@@ -0,0 +1,49 @@
+import pytest
+
+from src.server import ROUTES
+from tools.flagger import Flagger, FlaggedError
+from tools.plan import _plans, invalidate_plans, prepare_search
+from tools.report import build_report
+from utils.types import ReportPackage
+
+PKG = {"filters": [{"table": "Orders", "field": "city", "operator": "equals", "value": {"param": "city"}}]}
+
+@pytest.fixture(autouse=True)
+def fresh_plans():
+    invalidate_plans()
+    yield
+    invalidate_plans()
+
+def test_plan_binds_params_and_is_reused(db):
+    conn, ids = db
+    plan = prepare_search(PKG, conn, "sqlite", Flagger())
+    assert plan.param_names == ["city"]
+    assert len(plan.execute(conn, {"city": "Oslo"}, Flagger())) == 6
+    assert len(plan.execute(conn, {"city": "Rome"}, Flagger())) == 7
+    assert prepare_search(PKG, conn, "sqlite", Flagger()) is plan
+
+    with pytest.raises(FlaggedError) as e:
+        plan.execute(conn, {}, Flagger())
+    assert e.value.code == "MISSING_PARAMETER"
+
+    invalidate_plans()
+    assert not _plans
+    assert prepare_search(PKG, conn, "sqlite", Flagger()) is not plan
+
+def test_search_route_returns_matches(db):
+    conn, ids = db
+    result = ROUTES["/search"](dict(PKG, params={"city": "Paris"}), conn, "sqlite", Flagger())
+    assert sorted(result["uuids"]) == sorted(ids[0::3])
+
+def test_placeholder_outside_plan_is_rejected(db):
+    conn, _ = db
+    pkg = ReportPackage.from_dict({"table": "Orders", "search": PKG, "aggregates": [{"op": "count"}]})
+    with pytest.raises(FlaggedError) as e:
+        build_report(pkg, conn, "sqlite", Flagger())
+    assert e.value.code == "UNBOUND_PARAMETER"
+
+@pytest.mark.parametrize("body", [[1], {"filters": [1]}, {"filters": "x"}])
+def test_malformed_search_package_is_a_value_error(db, body):
+    conn, _ = db
+    with pytest.raises(ValueError):
+        prepare_search(body, conn, "sqlite", Flagger())
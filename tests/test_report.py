@@ -0,0 +1,68 @@
+import pytest
+
+from tools.flagger import Flagger, FlaggedError
+from tools.report import build_report
+from utils.types import ReportPackage
+
+def test_report_totals_groups_and_facets(db):
+    conn, _ = db
+    pkg = ReportPackage.from_dict({
+        "table": "Orders",
+        "search": {"filters": [
+            {"table": "Contact", "field": "email", "operator": "ends", "value": "x.com"},
+            {"table": "Orders", "field": "city", "operator": "equals", "value": "Oslo", "logic": "nand"}
+        ]},
+        "aggregates": [
+            {"op": "count"},
+            {"op": "sum", "field": "total"},
+            {"op": "count_distinct", "field": "city"}
+        ],
+        "group_by": "city",
+        "facets": [{"field": "city", "top": 1}]
+    })
+    report = build_report(pkg, conn, "sqlite", Flagger())
+
+    assert report["totals"] == {"count_all": 7, "sum_total": 100.5, "count_distinct_city": 2}
+    assert [g["city"] for g in report["groups"]] == ["Paris", "Rome"]
+    assert report["facets"] == {"city": [("Rome", 4)]}
+
+def test_report_rejects_unknown_aggregate_field(db):
+    conn, _ = db
+    pkg = ReportPackage.from_dict({"table": "Orders", "aggregates": [{"op": "sum", "field": "nope"}]})
+    with pytest.raises(FlaggedError) as e:
+        build_report(pkg, conn, "sqlite", Flagger())
+    assert e.value.code == "UNKNOWN_COLUMN"
+
+def test_report_runs_filters_once(db):
+    conn, _ = db
+    statements = []
+    conn.set_trace_callback(statements.append)
+    pkg = ReportPackage.from_dict({
+        "table": "Contact",
+        "search": {"filters": [{"table": "Orders", "field": "city", "operator": "equals", "value": "Rome"}]},
+        "group_by": "age",
+        "facets": [{"field": "age", "top": 2}, {"field": "tags", "top": 5}]
+    })
+    report = build_report(pkg, conn, "sqlite", Flagger())
+    conn.set_trace_callback(None)
+
+    selects = [s for s in statements if "filtered AS" in s]
+    assert len(selects) == 1 and selects[0].count("Orders") == 1
+    assert report["totals"] == {}
+    assert report["groups"] == [
+        {"age": 20, "count": 1}, {"age": 21, "count": 2}, {"age": 22, "count": 1},
+        {"age": 23, "count": 1}, {"age": 24, "count": 2}
+    ]
+    assert report["facets"] == {"age": [(21, 2), (24, 2)], "tags": [("a;b", 7)]}
+
+def test_report_on_empty_match(db):
+    conn, _ = db
+    pkg = ReportPackage.from_dict({
+        "table": "Orders",
+        "search": {"filters": [{"table": "Orders", "field": "city", "operator": "equals", "value": "Lima"}]},
+        "aggregates": [{"op": "count"}, {"op": "max", "field": "total", "alias": "top"}],
+        "facets": [{"field": "city"}]
+    })
+    report = build_report(pkg, conn, "sqlite", Flagger())
+    assert report["totals"] == {"count_all": 0, "top": None}
+    assert report["groups"] == [] and report["facets"] == {"city": []}
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+
+from tools.batch import process_batch
+from tools.flagger import Flagger, FlaggedError
+from tools.saved_search import get_saved_results, refresh_saved_search, save_search
+from tools.setup import setup_tables
+from utils.sql import CHUNK, chunked_in
+from utils.types import SearchPackageFlat
+
+OSLO = SearchPackageFlat.from_dict({"filters": [
+    {"table": "Orders", "field": "city", "operator": "equals", "value": "Oslo"}
+]})
+
+def _update(conn, records):
+    batch = SimpleNamespace(groups={"g": {"type": "update", "table": "Orders", "records": records}})
+    return process_batch(batch, conn, "sqlite", Flagger())
+
+def _tables(conn):
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def test_writes_never_create_side_tables(db):
+    conn, ids = db
+    _update(conn, [{"digitalID": ids[0], "city": "Oslo"}])
+    assert "batch_log" not in _tables(conn)
+    with pytest.raises(FlaggedError) as e:
+        save_search("oslo", OSLO, conn, "sqlite", Flagger())
+    assert e.value.code == "SETUP_REQUIRED"
+
+    assert setup_tables(conn, "sqlite") == ["batch_log", "saved_search", "saved_search_result"]
+    assert setup_tables(conn, "sqlite") == []
+
+def test_refresh_reports_only_changed_rows(db):
+    conn, ids = db
+    setup_tables(conn, "sqlite")
+    assert len(save_search("oslo", OSLO, conn, "sqlite", Flagger())) == 6
+    assert refresh_saved_search("oslo", conn, "sqlite", Flagger())["added"] == []
+
+    result = _update(conn, [{"digitalID": ids[0], "city": "Oslo"}, {"digitalID": ids[2], "city": "Rome"}])
+    delta = refresh_saved_search("oslo", conn, "sqlite", Flagger())
+    assert delta["batch_id"] == result["batch_id"]
+    assert delta["added"] == [ids[0]]
+    assert delta["removed"] == [ids[2]]
+    assert len(get_saved_results("oslo", conn, "sqlite")) == 6
+
+    # Nothing new since the last refresh
+    assert refresh_saved_search("oslo", conn, "sqlite", Flagger())["added"] == []
+
+def test_chunked_in_spans_chunks(db):
+    conn, ids = db
+    many = ids + [f"missing-{i}" for i in range(CHUNK * 2)]
+    rows = chunked_in(conn.cursor(), "sqlite",
+                      "SELECT digitalID FROM Orders WHERE city = ? AND digitalID IN", many, ["Oslo"])
+    assert len(rows) == 6
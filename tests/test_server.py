@@ -0,0 +1,126 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from src.server import ROUTES, QueryHandler
+from tools.flagger import Flagger, FlaggedError
+from tools import schema_introspect
+from tools.saved_search import refresh_saved_search, save_search
+from tools.schema_introspect import check_schema_version, enable_schema_cache, get_tables, require_table
+from tools.setup import setup_tables
+from utils.connect import ConnectionPool
+from utils.types import SearchPackageFlat
+
+INJECTED = "(SELECT name AS digitalID, sql FROM sqlite_master)"
+
+@pytest.mark.parametrize("route, body", [
+    ("/read",   {"tables": [INJECTED], "uuids": ["Contact"]}),
+    ("/report", {"table": INJECTED, "aggregates": [{"op": "count"}]}),
+    ("/create", {"table": INJECTED, "records": [{"x": 1}]}),
+    ("/update", {"table": INJECTED, "records": [{"digitalID": "a"}]}),
+    ("/delete", {"table": INJECTED, "records": [{"digitalID": "a"}]}),
+    ("/search", {"filters": [{"table": INJECTED, "field": "sql", "operator": "contains", "value": "x"}]}),
+])
+def test_client_table_names_must_exist(db, route, body):
+    conn, _ = db
+    with pytest.raises(FlaggedError) as e:
+        ROUTES[route](body, conn, "sqlite", Flagger())
+    # Write routes report it through the up-front validation gate
+    codes = [c for c, _ in e.value.context.get("errors", [])] or [e.value.code]
+    assert codes == ["UNKNOWN_TABLE"]
+
+def test_read_route_returns_records(db):
+    conn, ids = db
+    result = ROUTES["/read"]({"tables": ["Orders"], "uuids": [ids[2]]}, conn, "sqlite", Flagger())
+    assert result[ids[2]]["Orders"]["city"] == "Oslo"
+
+def test_pool_ends_transactions_on_release(file_db):
+    pool = ConnectionPool(1)
+    with pool.acquire() as conn:
+        conn.execute("UPDATE Orders SET city = 'X'")
+        assert conn.in_transaction
+    with pool.acquire() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM Orders WHERE city = 'X'").fetchone()[0] == 0
+    pool.close()
+
+@pytest.mark.parametrize("path, body", [
+    ("/search", [1]),
+    ("/search", {"filters": [1]}),
+    ("/read", "x"),
+    ("/read", {"tables": 5, "uuids": []}),
+    ("/create", {"table": ["Orders"], "records": []}),
+    ("/report", {"table": "Orders", "aggregates": [1]}),
+    ("/batch", {"groups": {"g": {"type": "update", "table": "Orders", "records": 5}}}),
+])
+def test_malformed_bodies_are_bad_requests(file_db, monkeypatch, path, body):
+    monkeypatch.setattr(QueryHandler, "pool", ConnectionPool(1))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), QueryHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+        req = urllib.request.Request(url, data=json.dumps(body).encode(), method="POST")
+        with pytest.raises(urllib.error.HTTPError) as e:
+            urllib.request.urlopen(req)
+        assert e.value.code == 400
+        assert json.loads(e.value.read())["error"] in ("INVALID_PACKAGE", "VALIDATION_FAILED")
+    finally:
+        server.shutdown()
+        server.server_close()
+        QueryHandler.pool.close()
+
+def test_server_writes_are_logged_as_batches(db):
+    conn, ids = db
+    setup_tables(conn, "sqlite")
+    oslo = SearchPackageFlat.from_dict({"filters": [
+        {"table": "Orders", "field": "city", "operator": "equals", "value": "Oslo"}
+    ]})
+    save_search("oslo", oslo, conn, "sqlite", Flagger())
+
+    ROUTES["/update"]({"table": "Orders", "records": [{"digitalID": ids[0], "city": "Oslo"}]},
+                      conn, "sqlite", Flagger())
+    ROUTES["/delete"]({"table": "Orders", "records": [{"digitalID": ids[2]}]}, conn, "sqlite", Flagger())
+
+    delta = refresh_saved_search("oslo", conn, "sqlite", Flagger())
+    assert (delta["added"], delta["removed"]) == ([ids[0]], [ids[2]])
+    assert conn.execute("SELECT COUNT(*) FROM batch_log").fetchone()[0] == 2
+
+def test_cached_schema_follows_ddl(db, monkeypatch):
+    conn, _ = db
+    monkeypatch.setattr(schema_introspect, "_schema_version", None)
+    enable_schema_cache()
+    check_schema_version(conn, "sqlite")
+    assert "Late" not in get_tables(conn, "sqlite")
+
+    conn.execute("CREATE TABLE Late (digitalID TEXT PRIMARY KEY)")
+    check_schema_version(conn, "sqlite")
+    require_table(conn, "Late", "sqlite", Flagger())
+
+def test_schema_cache_survives_concurrent_invalidation(file_db):
+    enable_schema_cache()
+    pool = ConnectionPool(4)
+    errors = []
+
+    def reader():
+        try:
+            with pool.acquire() as conn:
+                for _ in range(300):
+                    assert "Orders" in get_tables(conn, "sqlite")
+        except Exception as e:
+            errors.append(e)
+
+    def invalidator():
+        for _ in range(300):
+            schema_introspect.invalidate_schema_cache()
+
+    threads = [threading.Thread(target=reader) for _ in range(3)] + [threading.Thread(target=invalidator)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    pool.close()
+    assert errors == []
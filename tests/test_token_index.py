@@ -0,0 +1,99 @@
+import pytest
+
+from tools.create import create_records
+from tools.delete import delete_records
+from tools.filter_sql import search_identifiers
+from tools.flagger import Flagger, FlaggedError
+from tools.read_format import format_search_results
+from tools.search import search_records
+from tools.token_index import read_tokens, rebuild_token_index, tokens_for_matches
+from tools.update import update_records
+from types import SimpleNamespace
+from utils.types import CreatePackage, SearchPackageFlat
+
+def _tag_search(value):
+    return SearchPackageFlat.from_dict({"filters": [
+        {"table": "Contact", "field": "tags", "operator": "equals", "value": value, "index_by": ";"}
+    ]})
+
+def _tables(conn):
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+TOKEN_CASES = [
+    ("equals", "a"), ("equals", " a_b "), ("equals", "b"), ("equals", "a;b"), ("equals", ""),
+    ("equals", "x y"), ("begins", "a"), ("begins", "a_"), ("begins", "%"), ("begins", "a%"), ("begins", "x"),
+]
+
+def _token_search(conn, op, value):
+    pkg = SearchPackageFlat.from_dict({"filters": [
+        {"table": "Contact", "field": "tags", "operator": op, "value": value, "index_by": ";"}
+    ]})
+    return sorted(search_identifiers(pkg, conn, "sqlite", Flagger()))
+
+def test_index_changes_speed_not_results(db, settings):
+    conn, ids = db
+    settings["token_index"] = [{"table": "Contact", "field": "tags", "delimiter": ";"}]
+    conn.execute("UPDATE Contact SET tags = ' x y ;b;; a_b ' WHERE digitalID = ?", (ids[1],))
+    conn.execute("UPDATE Contact SET tags = 'a%;  c' WHERE digitalID = ?", (ids[2],))
+
+    # Unbuilt: a token scan of the column, and no side table is created by writes
+    scanned = {case: _token_search(conn, *case) for case in TOKEN_CASES}
+    create_records(CreatePackage("Contact", [{"tags": "q;r"}]), conn, "sqlite", Flagger())
+    assert "field_tokens" not in _tables(conn)
+    conn.execute("DELETE FROM Contact WHERE tags = 'q;r'")
+
+    assert len(scanned[("equals", "a")]) == 11
+    assert scanned[("equals", " a_b ")] == sorted(ids[0:19:3] + [ids[1]])
+    assert scanned[("equals", "a;b")] == scanned[("equals", "")] == []
+    assert scanned[("equals", "x y")] == [ids[1]]
+    assert scanned[("begins", "a%")] == [ids[2]] and scanned[("begins", "%")] == []
+
+    rebuild_token_index(conn, "sqlite", Flagger())
+    assert {case: _token_search(conn, *case) for case in TOKEN_CASES} == scanned
+
+def test_unknown_operator_is_rejected_by_every_search_path(db):
+    conn, _ = db
+    pkg = SimpleNamespace(filters={"Contact": [{"field": "email", "operator": "equalz", "value": "x"}]})
+    with pytest.raises(FlaggedError) as e:
+        search_records(pkg, conn, "sqlite", Flagger())
+    assert e.value.code == "UNKNOWN_OPERATOR"
+
+    pkg.filters["Contact"][0].update(operator="equals", logic="xor")
+    with pytest.raises(FlaggedError) as e:
+        search_records(pkg, conn, "sqlite", Flagger())
+    assert e.value.code == "UNKNOWN_LOGIC"
+
+def test_rebuilt_index_matches_tokens_and_tracks_writes(db, settings):
+    conn, ids = db
+    settings["token_index"] = [{"table": "Contact", "field": "tags", "delimiter": ";"}]
+    assert rebuild_token_index(conn, "sqlite", Flagger()) == 20
+
+    assert len(search_identifiers(_tag_search("a"), conn, "sqlite", Flagger())) == 13
+    assert len(search_identifiers(_tag_search("a_b"), conn, "sqlite", Flagger())) == 7
+
+    pkg = SimpleNamespace(table="Contact", records=[{"digitalID": ids[0], "tags": "z;q"}])
+    update_records(pkg, conn, "sqlite", Flagger())
+    assert read_tokens(conn, "sqlite", "Contact", "tags", [ids[0]]) == {ids[0]: ["z", "q"]}
+
+    pkg.records = [{"digitalID": ids[0]}]
+    delete_records(pkg, conn, "sqlite", Flagger())
+    assert read_tokens(conn, "sqlite", "Contact", "tags", [ids[0]]) == {}
+
+    new_ids = create_records(CreatePackage("Contact", [{"tags": "m;n"}]), conn, "sqlite", Flagger())
+    assert search_identifiers(_tag_search("n"), conn, "sqlite", Flagger()) == new_ids
+
+def test_formatter_uses_pre_split_tokens(db, settings):
+    conn, ids = db
+    settings["token_index"] = [{"table": "Contact", "field": "tags", "delimiter": ";"}]
+    rebuild_token_index(conn, "sqlite", Flagger())
+
+    pkg = SimpleNamespace(filters={"Contact": [
+        {"field": "tags", "operator": "begins", "value": "a_", "index_by": ";"}
+    ]})
+    matches = search_records(pkg, conn, "sqlite", Flagger())
+    tokens = tokens_for_matches(conn, "sqlite", matches)
+    assert set(tokens[("Contact", "tags")]) == set(matches)
+
+    # Records are empty, so the matched token can only come from the index
+    output = format_search_results(matches, {}, tokens=tokens)
+    assert "Contact.tags matched 'a_b'" in output
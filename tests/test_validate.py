@@ -0,0 +1,81 @@
+import uuid
+
+import pytest
+
+from src.server import ROUTES
+from tools.batch import process_batch
+from tools.flagger import Flagger, FlaggedError
+from tools.validate import check_batch, is_uuid
+from types import SimpleNamespace
+
+def test_flagger_error_always_raises():
+    flagger = Flagger()
+    with pytest.raises(FlaggedError):
+        flagger.error("ANY", {})
+    assert flagger.get_errors() == [("ANY", {})]
+
+def test_check_batch_collects_every_problem(db):
+    conn, ids = db
+    missing = str(uuid.uuid4())
+    pkg = SimpleNamespace(groups={
+        "g1": {"type": "create", "table": "Nope", "records": [{}]},
+        "g2": {"type": "update", "table": "Orders", "records": [{"digitalID": missing, "bad": 1}]},
+        "g3": {"type": "delete", "table": "Orders", "records": [{"digitalID": missing}]},
+    })
+    report = check_batch(pkg, conn, "sqlite")
+    assert not report.valid
+    assert sorted(code for code, _ in report.get_errors()) == ["RECORD_NOT_FOUND", "UNKNOWN_COLUMN", "UNKNOWN_TABLE"]
+    assert [code for code, _ in report.get_warnings()] == ["DELETE_RECORD_NOT_FOUND"]
+
+def test_batch_rejected_before_any_write(db):
+    conn, ids = db
+    pkg = SimpleNamespace(groups={
+        "g1": {"type": "update", "table": "Orders", "records": [{"digitalID": ids[0], "city": "Lima"}]},
+        "g2": {"type": "update", "table": "Orders", "records": [{"digitalID": ids[1], "bad": 1}]},
+    })
+    with pytest.raises(FlaggedError) as e:
+        process_batch(pkg, conn, "sqlite", Flagger())
+    assert e.value.code == "VALIDATION_FAILED"
+    assert conn.execute("SELECT COUNT(*) FROM Orders WHERE city = 'Lima'").fetchone()[0] == 0
+
+def test_create_route_validates_whole_payload(db):
+    conn, _ = db
+    body = {"table": "Orders", "records": [
+        {"digitalID": str(uuid.uuid4()), "city": "Lima"},
+        {"digitalID": str(uuid.uuid4()), "bad": 1},
+    ]}
+    with pytest.raises(FlaggedError) as e:
+        ROUTES["/create"](body, conn, "sqlite", Flagger())
+    assert e.value.code == "VALIDATION_FAILED"
+    assert conn.execute("SELECT COUNT(*) FROM Orders WHERE city = 'Lima'").fetchone()[0] == 0
+
+def test_validate_route_reports_without_raising(db):
+    conn, ids = db
+    body = {"groups": {"g": {"type": "update", "table": "Orders", "records": [{"digitalID": ids[0], "bad": 1}]}}}
+    result = ROUTES["/validate"](body, conn, "sqlite", Flagger())
+    assert result["valid"] is False
+    assert result["errors"] == [("UNKNOWN_COLUMN", {"table": "Orders", "field": "bad"})]
+
+@pytest.mark.parametrize("value, expected", [
+    ("00000000-0000-0000-0000-000000000001", True),
+    ("{00000000-0000-0000-0000-000000000001}", True),
+    ("urn:uuid:00000000000000000000000000000001", True),
+    ("00000000-0000-0000-0000-000000000001\n", False),
+    (" 00000000-0000-0000-0000-000000000001", False),
+    ("new-contact", False),
+])
+def test_is_uuid_agrees_with_uuid_module(value, expected):
+    assert is_uuid(value) is expected
+    try:
+        uuid.UUID(value)
+        parsed = True
+    except ValueError:
+        parsed = False
+    assert parsed is expected
+
+def test_group_name_with_newline_is_a_create(db):
+    conn, ids = db
+    pkg = SimpleNamespace(groups={ids[0] + "\n": [{"table": "Orders", "fields": {"city": "Lima"}}]})
+    result = process_batch(pkg, conn, "sqlite", Flagger())
+    assert list(result["created"]) == [ids[0] + "\n"] and result["updated"] == []
+    assert conn.execute("SELECT city FROM Orders WHERE digitalID = ?", (ids[0],)).fetchone()[0] == "Paris"
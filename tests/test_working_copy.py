@@ -0,0 +1,78 @@
+import os
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from tools.batch import process_batch
+from tools.flagger import Flagger
+from tools.read import read_records
+from tools.setup import setup_tables
+from utils.connect import get_connection, open_working_copy
+
+def _batch(groups):
+    conn = get_connection()
+    try:
+        return process_batch(SimpleNamespace(groups=groups), conn, "sqlite", Flagger())
+    finally:
+        conn.close()
+
+def _city(copy, uuid_val):
+    pkg = SimpleNamespace(filters=["Orders"], uuids=[uuid_val])
+    return read_records(pkg, copy.conn, "sqlite")[uuid_val]["Orders"].get("city")
+
+@pytest.mark.parametrize("mode", ["memory", "mmap"])
+def test_incremental_refresh_replays_batches(file_db, mode):
+    _, ids = file_db
+    conn = get_connection()
+    setup_tables(conn, "sqlite")
+    conn.close()
+    copy = open_working_copy(mode)
+    try:
+        assert _city(copy, ids[0]) == "Paris"
+
+        _batch({
+            "g1": {"type": "update", "table": "Orders", "records": [{"digitalID": ids[0], "city": "Lima"}]},
+            "g2": {"type": "delete", "table": "Orders", "records": [{"digitalID": ids[1]}]},
+        })
+
+        # The copy is a snapshot until refreshed
+        assert _city(copy, ids[0]) == "Paris"
+        assert copy.refresh() > 0
+        assert _city(copy, ids[0]) == "Lima"
+        assert _city(copy, ids[1]) is None
+        assert copy.refresh() == 0
+    finally:
+        copy.close()
+
+def test_copy_is_read_only_and_indexed(file_db):
+    copy = open_working_copy("memory", indexes=[{"table": "Orders", "fields": ["city"]}])
+    try:
+        names = {r[0] for r in copy.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "wc_Orders_city" in names
+        with pytest.raises(sqlite3.OperationalError):
+            copy.conn.execute("DELETE FROM Orders")
+    finally:
+        copy.close()
+
+    # Report indexes never reach the source database
+    source = get_connection()
+    names = {r[0] for r in source.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    source.close()
+    assert "wc_Orders_city" not in names
+
+def test_mmap_copy_removes_its_file(file_db):
+    copy = open_working_copy("mmap")
+    path = copy._path
+    copy.close()
+    assert not os.path.exists(path)
+
+def test_refresh_without_batch_log_is_full(file_db):
+    _, ids = file_db
+    copy = open_working_copy("memory")
+    try:
+        _batch({"g": {"type": "update", "table": "Orders", "records": [{"digitalID": ids[0], "city": "Lima"}]}})
+        assert copy.refresh() == -1
+        assert _city(copy, ids[0]) == "Lima"
+    finally:
+        copy.close()
@@ -0,0 +1,117 @@
+# tools/async_api.py
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from tools.batch import process_batch
+from tools.flagger import Flagger
+from tools.plan import prepare_search
+from tools.read import read_table
+from tools.search import combine_clauses, evaluate_clause, merge_table_results, table_universe
+from utils.config import get_async_settings
+from utils.connect import ConnectionPool
+
+class AsyncEngine:
+    """
+    Asyncio front end over the sync tools. Driver calls run on a thread
+    pool no larger than the connection pool, so any number of awaiting
+    callers share a fixed set of threads and connections. A call that is
+    cancelled or times out interrupts its query where the driver allows.
+    """
+    def __init__(self, pool_size: Optional[int] = None, timeout: Optional[float] = None):
+        settings = get_async_settings()
+        size = pool_size or settings["pool_size"]
+        self.timeout = timeout if timeout is not None else settings["timeout"]
+        self.pool = ConnectionPool(size)
+        self.db_type = self.pool.db_type
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="db")
+
+    async def search_records(self, pkg, flagger: Flagger, timeout: Optional[float] = None) -> dict:
+        # Every table universe and every clause runs on its own connection;
+        # clauses are then combined per table and merged as in the sync path
+        tables = list(pkg.filters.items())
+        calls = []
+        for table, clauses in tables:
+            calls.append(self._call(lambda conn, t=table: table_universe(conn, self.db_type, flagger, t), timeout))
+            calls.extend(
+                self._call(lambda conn, t=table, c=clause: evaluate_clause(conn, self.db_type, flagger, t, c), timeout)
+                for clause in clauses
+            )
+        sets = iter(await asyncio.gather(*calls))
+
+        results = []
+        for table, clauses in tables:
+            universe = next(sets)
+            matched = [next(sets) for _ in clauses]
+            results.append((table, clauses, combine_clauses(table, clauses, matched, universe)))
+        return merge_table_results(results)
+
+    async def search(self, pkg, params: Optional[dict], flagger: Flagger,
+                     timeout: Optional[float] = None) -> list[str]:
+        # Prepared-plan lookup: `pkg` is a SearchPackageFlat or its dict form
+        def run(conn):
+            plan = prepare_search(pkg, conn, self.db_type, flagger)
+            return plan.execute(conn, params or {}, flagger)
+        return await self._call(run, timeout)
+
+    async def read_records(self, pkg, timeout: Optional[float] = None) -> dict:
+        tables = list(pkg.filters)
+        rows = await asyncio.gather(*[
+            self._call(lambda conn, t=table: read_table(conn, self.db_type, t, pkg.uuids), timeout)
+            for table in tables
+        ])
+        merged = {uuid: {} for uuid in pkg.uuids}
+        for table, table_rows in zip(tables, rows):
+            for uuid in pkg.uuids:
+                merged[uuid][table] = table_rows.get(uuid, {})
+        return merged
+
+    async def process_batch(self, pkg, flagger: Flagger, timeout: Optional[float] = None) -> dict:
+        # An interrupted batch fails inside process_batch and is rolled back there
+        return await self._call(lambda conn: process_batch(pkg, conn, self.db_type, flagger), timeout)
+
+    async def close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self.pool.close()
+
+    async def _call(self, fn, timeout: Optional[float]):
+        # `running` is only true while fn owns the connection, and the worker
+        # clears it under the lock before the connection goes back to the
+        # pool, so an interrupt can never reach another caller's query
+        lock = threading.Lock()
+        state = {"conn": None, "running": False, "abandoned": False}
+
+        def work():
+            with self.pool.acquire() as conn:
+                with lock:
+                    if state["abandoned"]:
+                        # Timed out while queued; nobody is waiting for a result
+                        return None
+                    state["conn"], state["running"] = conn, True
+                try:
+                    return fn(conn)
+                finally:
+                    with lock:
+                        state["conn"], state["running"] = None, False
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, work)
+        try:
+            return await asyncio.wait_for(future, timeout if timeout is not None else self.timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            with lock:
+                state["abandoned"] = True
+                if state["running"]:
+                    _interrupt(state["conn"], self.db_type)
+            raise
+
+def _interrupt(conn, db_type: str) -> None:
+    # Threads cannot be killed, so stop the statement they are blocked on
+    try:
+        if db_type == "sqlite":
+            conn.interrupt()
+        elif db_type == "postgres":
+            conn.cancel()
+    except Exception as e:
+        logging.debug(f"[DEBUG] Could not interrupt query: {e}")
@@ -3,6 +3,10 @@
 import uuid
 from typing import cast
 from tools.flagger import Flagger
+from tools.schema_introspect import get_tables
+from tools.setup import BATCH_LOG
+from tools.validate import is_uuid, validate_batch
+from utils.sql import placeholder
 from tools.create import create_records
 from tools.update import update_records
 from tools.delete import delete_records
@@ -15,6 +19,10 @@ def process_batch(pkg, conn, db_type: str, flagger: Flagger) -> dict:
     deleted = []
     identifier = get_primary_identifier()
 
+    # Reject bad payloads up front, before any write or transaction.
+    # Warnings are left to the write paths so they are not reported twice.
+    validate_batch(pkg, conn, db_type, flagger)
+
     try:
         cur = conn.cursor()
 
@@ -64,7 +72,7 @@ def process_batch(pkg, conn, db_type: str, flagger: Flagger) -> dict:
 
             else:
                 # UUID = update block
-                if _is_uuid(group_name):
+                if is_uuid(group_name):
                     if not isinstance(ops, list):
                         flagger.error("INVALID_UPDATE_GROUP", {
                             "group": group_name,
@@ -108,6 +116,8 @@ def process_batch(pkg, conn, db_type: str, flagger: Flagger) -> dict:
                         )
                     created[group_name] = new_uuid
 
+        log_batch(conn, db_type, batch_id)
+
         conn.commit()
         return {
             "batch_id": batch_id,
@@ -123,12 +133,11 @@ def process_batch(pkg, conn, db_type: str, flagger: Flagger) -> dict:
 
 # --- Helpers ---
 
-def _is_uuid(val: str) -> bool:
-    try:
-        uuid.UUID(str(val))
-        return True
-    except ValueError:
-        return False
+def log_batch(conn, db_type: str, batch_id: str) -> None:
+    # Sequence the batch so field_log deltas can be read in order.
+    # batch_log only exists once setup_tables() has run.
+    if BATCH_LOG in get_tables(conn, db_type):
+        conn.cursor().execute(f"INSERT INTO {BATCH_LOG} (batch_id) VALUES ({placeholder(db_type)})", (batch_id,))
 
 def _wrap(table: str, records: list[dict]):
     class Pkg:
@@ -2,12 +2,14 @@
 
 from typing import Optional
 from tools.flagger import Flagger
-from tools.schema_introspect import get_columns
+from tools.schema_introspect import get_columns, require_table
+from tools.token_index import index_record, indexed_fields
 from utils.config import get_primary_identifier
 
 def create_records(pkg, conn, db_type: str, flagger: Flagger, batch_id: Optional[str] = None):
     table = pkg.table
     identifier = get_primary_identifier()
+    require_table(conn, table, db_type, flagger)
     columns = get_columns(conn, table, db_type)
 
     if identifier not in columns:
@@ -17,6 +19,11 @@ def create_records(pkg, conn, db_type: str, flagger: Flagger, batch_id: Optional
             "available": columns
         })
 
+    token_fields = indexed_fields(conn, db_type, table)
+
+    column_set = set(columns)
+    checked: set[frozenset] = set()
+
     created_uuids = []
     for record in pkg.records:
         # Generate UUID if not present
@@ -26,13 +33,15 @@ def create_records(pkg, conn, db_type: str, flagger: Flagger, batch_id: Optional
             uuid_val = str(uuid.uuid4())
             record[identifier] = uuid_val
 
-        # Validate all fields exist
-        for field in record:
-            if field not in columns:
+        # Validate all fields exist, once per distinct set of fields
+        signature = frozenset(record)
+        if signature not in checked:
+            for field in signature - column_set:
                 flagger.error("UNKNOWN_COLUMN", {
                     "table": table,
                     "field": field
                 })
+            checked.add(signature)
 
         # Insert
         field_names = list(record.keys())
@@ -43,14 +52,18 @@ def create_records(pkg, conn, db_type: str, flagger: Flagger, batch_id: Optional
         cur = conn.cursor()
         cur.execute(query, values)
 
+        if token_fields:
+            index_record(cur, db_type, table, uuid_val, record, token_fields)
+
         # Audit each field
         if batch_id:
+            log_placeholders = ", ".join(["?"] * 6) if db_type == "sqlite" else ", ".join(["%s"] * 6)
             for field, value in record.items():
                 log_query = f"""
                     INSERT INTO field_log (
                         batch_id, record_uuid, table_name, field_name,
                         old_value, new_value
-                    ) VALUES ({placeholders})
+                    ) VALUES ({log_placeholders})
                 """
                 log_values = [batch_id, uuid_val, table, field, None, str(value)]
                 cur.execute(log_query, log_values)
@@ -2,12 +2,14 @@
 
 from typing import Optional
 from tools.flagger import Flagger
-from tools.schema_introspect import get_columns
+from tools.schema_introspect import get_columns, require_table
+from tools.token_index import drop_record_tokens, indexed_fields
 from utils.config import get_primary_identifier
 
 def delete_records(pkg, conn, db_type: str, flagger: Flagger, batch_id: Optional[str] = None) -> bool:
     table = pkg.table
     identifier = get_primary_identifier()
+    require_table(conn, table, db_type, flagger)
     columns = get_columns(conn, table, db_type)
 
     if identifier not in columns:
@@ -17,6 +19,8 @@ def delete_records(pkg, conn, db_type: str, flagger: Flagger, batch_id: Optional
             "available": columns
         })
 
+    token_fields = indexed_fields(conn, db_type, table)
+
     cur = conn.cursor()
 
     for record in pkg.records:
@@ -47,6 +51,9 @@ def delete_records(pkg, conn, db_type: str, flagger: Flagger, batch_id: Optional
         delete_query = f"DELETE FROM {table} WHERE {identifier} = %s" if db_type != "sqlite" else f"DELETE FROM {table} WHERE {identifier} = ?"
         cur.execute(delete_query, (uuid_val,))
 
+        if token_fields:
+            drop_record_tokens(cur, db_type, table, uuid_val)
+
         # Audit full row as "deleted"
         if batch_id:
             for field, value in old_data.items():
@@ -0,0 +1,250 @@
+# tools/filter_sql.py
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional
+from tools.flagger import Flagger
+from tools.schema_introspect import get_columns, get_tables, require_table, SKIP_PK_CHECK
+from tools.token_index import built_token_fields, token_select
+from utils.config import get_primary_identifier
+from utils.sql import placeholder
+
+OPERATORS   = ("begins", "ends", "contains", "equals")
+LOGICS      = ("and", "or", "nand", "nor")
+LIKE_ESCAPE = "!"
+
+@dataclass(frozen=True)
+class Param:
+    """
+    Stand-in for a filter value written as {"param": "<name>"}; the
+    operator's pattern is applied when the value is bound.
+    """
+    name: str
+    op: str
+    token: bool = False
+    delimiter: Optional[str] = None
+
+    def bind(self, value):
+        return bind_value(self.op, value, self.token, self.delimiter)
+
+def param_name(value):
+    if isinstance(value, dict) and set(value) == {"param"}:
+        return value["param"]
+    return None
+
+def text_cast(column: str, db_type: str) -> str:
+    if db_type == "mysql":
+        return f"CAST({column} AS CHAR)"
+    return f"CAST({column} AS TEXT)"
+
+def bind_value(op: str, value, token: bool = False, delimiter: Optional[str] = None) -> Any:
+    # Turn a filter value into the parameter the operator's SQL expects.
+    # Token values are stripped; with `delimiter` they become the needle for
+    # token_scan_sql. A value that cannot be a token binds NULL, matching nothing.
+    if token:
+        text = str(value).strip()
+        if not text or (delimiter and delimiter in text):
+            return None
+        if op == "equals":
+            return f"{delimiter}{text}{delimiter}" if delimiter else text
+        if delimiter:
+            return f"%{escape_like(delimiter + text)}%"
+        return f"{escape_like(text)}%"
+    if op == "equals":
+        return value
+    text = escape_like(str(value))
+    if op == "begins":
+        return f"{text}%"
+    if op == "ends":
+        return f"%{text}"
+    return f"%{text}%"
+
+def escape_like(text: str) -> str:
+    for ch in (LIKE_ESCAPE, "%", "_"):
+        text = text.replace(ch, LIKE_ESCAPE + ch)
+    return text
+
+def compare_sql(column: str, op: str, db_type: str) -> str:
+    ph = placeholder(db_type)
+    if op == "equals":
+        return f"{column} = {ph}"
+    return f"{text_cast(column, db_type)} LIKE {ph} ESCAPE '{LIKE_ESCAPE}'"
+
+def concat_sql(parts: list[str], db_type: str) -> str:
+    if db_type == "mysql":
+        return f"CONCAT({', '.join(parts)})"
+    return " || ".join(parts)
+
+def token_scan_sql(column: str, op: str, db_type: str) -> str:
+    """
+    Token equals/begins straight off the column, for fields without a
+    built token index. The value is normalised like split_tokens, so
+    this returns exactly what the index lookup would.
+    Params: token_scan_params(delimiter) + the bound value.
+    """
+    ph = placeholder(db_type)
+    wrapped = concat_sql([ph, text_cast(column, db_type), ph], db_type)
+    norm = f"REPLACE(REPLACE({wrapped}, {ph}, {ph}), {ph}, {ph})"
+    if op == "equals":
+        find = "strpos" if db_type == "postgres" else "INSTR"
+        return f"{find}({norm}, {ph}) > 0"
+    return f"{norm} LIKE {ph} ESCAPE '{LIKE_ESCAPE}'"
+
+def token_scan_params(delimiter: str) -> list[str]:
+    return [delimiter, delimiter, f" {delimiter}", delimiter, f"{delimiter} ", delimiter]
+
+def compile_search(pkg, conn, db_type: str, flagger: Flagger, ident_expr: str,
+                   allow_params: bool = False) -> tuple[str, list, list[str]]:
+    """
+    Compile a SearchPackageFlat into a boolean SQL predicate over
+    `ident_expr`. Returns (predicate, params, tables searched).
+    {"param": ...} values are only accepted when `allow_params` is set,
+    i.e. by prepared plans, which bind them before executing.
+    """
+    identifier = get_primary_identifier()
+    tables: list[str] = []
+    groups: dict[int, tuple[str, list]] = {}
+
+    for f in pkg.filters:
+        sub_sql, sub_params, sub_tables = compile_filter(f, conn, db_type, flagger, identifier, allow_params)
+        for t in sub_tables:
+            if t not in tables:
+                tables.append(t)
+
+        pred = f"{ident_expr} IN ({sub_sql})"
+        if f.logic in ("nand", "nor"):
+            pred = f"NOT ({pred})"
+
+        if f.group not in groups:
+            groups[f.group] = (pred, sub_params)
+        else:
+            prev_sql, prev_params = groups[f.group]
+            joiner = "OR" if f.logic in ("or", "nor") else "AND"
+            groups[f.group] = (f"({prev_sql} {joiner} {pred})", prev_params + sub_params)
+
+    parts: list[str] = []
+    params: list = []
+    used: set[int] = set()
+    for idx, gl in enumerate(pkg.group_logic, start=1):
+        if gl.logic not in LOGICS:
+            flagger.error("UNKNOWN_LOGIC", {"group_logic": idx, "logic": gl.logic})
+        members = [g for g in gl.groups if g in groups]
+        if not members:
+            continue
+        joiner = " OR " if gl.logic in ("or", "nor") else " AND "
+        sql = "(" + joiner.join(groups[g][0] for g in members) + ")"
+        if gl.logic in ("nand", "nor"):
+            sql = f"NOT {sql}"
+        parts.append(sql)
+        for g in members:
+            params.extend(groups[g][1])
+        used.update(members)
+
+    for g, (sql, gparams) in groups.items():
+        if g not in used:
+            parts.append(sql)
+            params.extend(gparams)
+
+    predicate = " AND ".join(parts) if parts else "1 = 1"
+    logging.debug(f"[DEBUG] Compiled predicate: {predicate} params={params}")
+    return predicate, params, tables
+
+def universe_sql(tables: list[str]) -> str:
+    identifier = get_primary_identifier()
+    return " UNION ".join(f"SELECT {identifier} FROM {t}" for t in tables)
+
+def search_identifiers(pkg, conn, db_type: str, flagger: Flagger) -> list[str]:
+    # Run the whole package as a single query and return matching identifiers
+    identifier = get_primary_identifier()
+    predicate, params, tables = compile_search(pkg, conn, db_type, flagger, f"u.{identifier}")
+    if not tables:
+        return []
+    query = f"SELECT u.{identifier} FROM ({universe_sql(tables)}) u WHERE {predicate}"
+    cur = conn.cursor()
+    cur.execute(query, params)
+    return [row[0] for row in cur.fetchall()]
+
+def searchable_tables(conn, db_type: str) -> list[str]:
+    return [t for t in get_tables(conn, db_type) if t not in SKIP_PK_CHECK]
+
+def compile_filter(f, conn, db_type: str, flagger: Flagger, identifier: str,
+                   allow_params: bool = False) -> tuple[str, list, list[str]]:
+    # Checked here so every caller gets them, not just compile_search
+    if f.operator not in OPERATORS:
+        flagger.error("UNKNOWN_OPERATOR", {"table": f.table, "field": f.field, "operator": f.operator})
+    if f.logic not in LOGICS:
+        flagger.error("UNKNOWN_LOGIC", {"table": f.table, "field": f.field, "logic": f.logic})
+
+    name = param_name(f.value)
+    if name is not None and not allow_params:
+        flagger.error("UNBOUND_PARAMETER", {"table": f.table, "field": f.field, "param": name})
+
+    wildcard_table = f.table == "*"
+    candidates = searchable_tables(conn, db_type) if wildcard_table else [f.table]
+
+    token_fields = built_token_fields(conn, db_type)
+    selects: list[str] = []
+    params: list = []
+    tables: list[str] = []
+    for table in candidates:
+        if not wildcard_table:
+            require_table(conn, table, db_type, flagger)
+        columns = get_columns(conn, table, db_type)
+        if identifier not in columns:
+            if wildcard_table:
+                continue
+            flagger.error("MISSING_IDENTIFIER_COLUMN", {
+                "table": table,
+                "expected": identifier,
+                "available": columns
+            })
+
+        if f.field == "*":
+            fields = [c for c in columns if c != identifier]
+        elif f.field in columns:
+            fields = [f.field]
+        elif wildcard_table:
+            continue
+        else:
+            flagger.error("UNKNOWN_COLUMN", {"table": table, "field": f.field})
+
+        if not fields:
+            continue
+        tables.append(table)
+
+        # Token equals/begins read the side table once the field's index is
+        # built; until then a token scan of the column gives the same answer
+        conds: list[str] = []
+        cond_params: list = []
+        for col in fields:
+            if _uses_token_index(f, table, col, token_fields):
+                selects.append(token_select(db_type, f.operator))
+                params.extend([table, col, _filter_value(f, name, token=True)])
+            elif _is_token_clause(f):
+                conds.append(token_scan_sql(col, f.operator, db_type))
+                cond_params.extend(token_scan_params(f.index_by))
+                cond_params.append(_filter_value(f, name, token=True, delimiter=f.index_by))
+            else:
+                conds.append(compare_sql(col, f.operator, db_type))
+                cond_params.append(_filter_value(f, name))
+
+        if conds:
+            selects.append(f"SELECT {identifier} FROM {table} WHERE {' OR '.join(conds)}")
+            params.extend(cond_params)
+
+    if not selects:
+        # Nothing to search: an always-empty subquery keeps the predicate valid
+        return "SELECT NULL WHERE 1 = 0", [], tables
+    return " UNION ".join(selects), params, tables
+
+def _filter_value(f, name, token: bool = False, delimiter: Optional[str] = None):
+    # Placeholders stay symbolic until a plan binds them
+    if name is not None:
+        return Param(name, f.operator, token, delimiter)
+    return bind_value(f.operator, f.value, token, delimiter)
+
+def _is_token_clause(f) -> bool:
+    return bool(f.index_by) and f.operator in ("equals", "begins")
+
+def _uses_token_index(f, table: str, field: str, token_fields: dict) -> bool:
+    return _is_token_clause(f) and token_fields.get((table, field)) == f.index_by
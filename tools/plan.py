@@ -0,0 +1,100 @@
+# tools/plan.py
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from tools.flagger import Flagger
+from tools.filter_sql import Param, compile_search, universe_sql
+from tools.schema_introspect import schema_generation, schema_version
+from utils.config import get_primary_identifier, get_plan_cache_size
+from utils.types import SearchPackageFlat
+
+class SearchPlan:
+    """
+    A search package compiled once: columns validated, wildcards
+    resolved and SQL generated for one dialect. Filter values given as
+    {"param": "<name>"} are bound on each execute().
+    """
+    def __init__(self, sql: str, params: list, tables: list[str], db_type: str, generation: int, version):
+        self.sql = sql
+        self.params = params
+        self.tables = tables
+        self.db_type = db_type
+        self.generation = generation
+        self.version = version
+
+    @property
+    def param_names(self) -> list[str]:
+        names = []
+        for p in self.params:
+            if isinstance(p, Param) and p.name not in names:
+                names.append(p.name)
+        return names
+
+    def bind(self, values: dict, flagger: Flagger) -> list:
+        if not isinstance(values, dict):
+            raise ValueError("Search params must be an object of name: value")
+        missing = [n for n in self.param_names if n not in values]
+        if missing:
+            flagger.error("MISSING_PARAMETER", {"missing": missing})
+        return [p.bind(values[p.name]) if isinstance(p, Param) else p for p in self.params]
+
+    def execute(self, conn, values: dict, flagger: Flagger) -> list[str]:
+        if not self.tables:
+            return []
+        cur = conn.cursor()
+        cur.execute(self.sql, self.bind(values or {}, flagger))
+        return [row[0] for row in cur.fetchall()]
+
+def compile_plan(pkg, conn, db_type: str, flagger: Flagger) -> SearchPlan:
+    identifier = get_primary_identifier()
+    generation = schema_generation()
+    version = schema_version(conn, db_type)
+    predicate, params, tables = compile_search(pkg, conn, db_type, flagger, f"u.{identifier}", allow_params=True)
+    sql = f"SELECT u.{identifier} FROM ({universe_sql(tables)}) u WHERE {predicate}" if tables else ""
+    return SearchPlan(sql, params, tables, db_type, generation, version)
+
+# --- LRU plan cache ---
+
+_plans: "OrderedDict[tuple, SearchPlan]" = OrderedDict()
+_lock = threading.Lock()
+
+def prepare_search(pkg, conn, db_type: str, flagger: Flagger) -> SearchPlan:
+    """
+    Return a cached plan for this package shape, compiling it on a miss.
+    `pkg` may be a SearchPackageFlat or its dict form. Plans compiled
+    before a schema change are recompiled.
+    """
+    if isinstance(pkg, SearchPackageFlat):
+        pkg_dict = pkg.to_dict()
+    elif not isinstance(pkg, dict):
+        raise ValueError(f"Search package must be an object, not {type(pkg).__name__}")
+    else:
+        pkg_dict = {"filters": pkg.get("filters"), "group_logic": pkg.get("group_logic", [])}
+    key = (db_type, json.dumps(pkg_dict, sort_keys=True, default=str))
+
+    with _lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+
+    if plan is not None and plan.generation == schema_generation() \
+            and plan.version == schema_version(conn, db_type):
+        return plan
+
+    if not isinstance(pkg, SearchPackageFlat):
+        pkg = SearchPackageFlat.from_dict(pkg_dict)
+    plan = compile_plan(pkg, conn, db_type, flagger)
+    logging.debug(f"[DEBUG] Compiled search plan: {plan.sql}")
+
+    with _lock:
+        _plans[key] = plan
+        _plans.move_to_end(key)
+        while len(_plans) > get_plan_cache_size():
+            _plans.popitem(last=False)
+    return plan
+
+def invalidate_plans() -> None:
+    with _lock:
+        _plans.clear()
@@ -1,17 +1,34 @@
 import logging
+from typing import Optional
+from tools.flagger import Flagger
+from tools.schema_introspect import require_table
 from utils.config import get_primary_identifier
+from utils.sql import chunked_in
 
-def read_records(pkg, conn, db_type: str) -> dict:
+def read_records(pkg, conn, db_type: str, flagger: Optional[Flagger] = None) -> dict:
     logging.debug(f"[DEBUG] read_records called for UUIDs: {pkg.uuids}")
-    identifier = get_primary_identifier()
-    merged = {}
+    merged = {uuid: {} for uuid in pkg.uuids}
 
     for table in pkg.filters:
+        rows = read_table(conn, db_type, table, pkg.uuids, flagger)
         for uuid in pkg.uuids:
-            query = f"SELECT * FROM {table} WHERE {identifier} = ?"
-            row = conn.execute(query, (uuid,)).fetchone()
-            logging.debug(f"[DEBUG] Fetched row for {table}, UUID={uuid}: {row}")
-            merged.setdefault(uuid, {})[table] = dict(row) if row else {}
+            merged[uuid][table] = rows.get(uuid, {})
 
     logging.debug(f"[DEBUG] Merged records: {merged}")
     return merged
+
+def read_table(conn, db_type: str, table: str, uuids: list[str],
+               flagger: Optional[Flagger] = None) -> dict:
+    # One IN query per chunk instead of one query per identifier
+    require_table(conn, table, db_type, flagger or Flagger())
+    identifier = get_primary_identifier()
+    out: dict[str, dict] = {}
+    cur = conn.cursor()
+    rows = chunked_in(cur, db_type, f"SELECT * FROM {table} WHERE {identifier} IN", uuids)
+    if rows:
+        names = [desc[0] for desc in cur.description]
+        for row in rows:
+            rec = dict(zip(names, row))
+            out[rec[identifier]] = rec
+    logging.debug(f"[DEBUG] Fetched {len(out)} rows from {table}")
+    return out
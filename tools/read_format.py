@@ -1,9 +1,11 @@
 import logging
-from typing import Dict
+from typing import Dict, Optional
+from tools.token_index import split_tokens
 
 def format_search_results(matches: Dict[str, list],
                           records: Dict[str, dict],
-                          display_field: str = 'fullName') -> str:
+                          display_field: str = 'fullName',
+                          tokens: Optional[Dict[tuple, Dict[str, list]]] = None) -> str:
     logging.debug("[DEBUG] format_search_results called")
     logging.debug(f"[DEBUG] Matches: {matches}")
     logging.debug(f"[DEBUG] Records: {records}")
@@ -20,6 +22,10 @@ def format_search_results(matches: Dict[str, list],
                 tbl = hit['table']
                 fld = clause['field']
                 val = clause['value']
+                if clause.get('index_by'):
+                    hit_tokens = _matched_tokens(uuid, rec, tbl, clause, tokens)
+                    if hit_tokens:
+                        val = ", ".join(hit_tokens)
                 lines.append(f"  - {tbl}.{fld} matched '{val}'")
                 logging.debug(f"[DEBUG] Hit detail: {tbl}.{fld} matched '{val}'")
 
@@ -34,3 +40,32 @@ def format_search_results(matches: Dict[str, list],
     result = "\n".join(lines)
     logging.debug(f"[DEBUG] Final formatted output:\n{result}")
     return result
+
+def _matched_tokens(uuid: str, rec: dict, tbl: str, clause: dict,
+                    tokens: Optional[Dict[tuple, Dict[str, list]]]) -> list:
+    # Prefer the token index's pre-split values; fall back to splitting the record
+    fld   = clause['field']
+    delim = clause['index_by']
+    split = (tokens or {}).get((tbl, fld), {}).get(uuid)
+    if split is None:
+        split = split_tokens(rec.get(tbl, {}).get(fld), delim)
+
+    op     = clause.get('operator', 'contains')
+    needle = str(clause['value'])
+    if op in ('equals', 'begins'):
+        needle = needle.strip()     # as bind_value does for token values
+    if op == 'equals':
+        hits = [t for t in split if t == needle]
+    elif op == 'begins':
+        hits = [t for t in split if t.startswith(needle)]
+    elif op == 'ends':
+        hits = [t for t in split if t.endswith(needle)]
+    else:
+        hits = [t for t in split if needle in t]
+
+    position = clause.get('position', 'none')
+    if position == 'before':
+        return [f"{delim}{t}" for t in hits]
+    if position == 'after':
+        return [f"{t}{delim}" for t in hits]
+    return hits
@@ -0,0 +1,127 @@
+# tools/report.py
+
+import logging
+from tools.flagger import Flagger
+from tools.filter_sql import compile_search
+from tools.schema_introspect import get_columns, require_table
+from utils.config import get_primary_identifier
+
+AGGREGATES = ("count", "count_distinct", "sum", "min", "max")
+
+def build_report(pkg, conn, db_type: str, flagger: Flagger) -> dict:
+    """
+    Evaluate a ReportPackage in the database as a single statement. The
+    search package is compiled into the WHERE clause of one `filtered`
+    CTE, and totals, groups and facets all aggregate over that CTE, so
+    the filters run once and only aggregates come back.
+    """
+    logging.debug(f"[DEBUG] build_report called for table '{pkg.table}'")
+    table = pkg.table
+    identifier = get_primary_identifier()
+    require_table(conn, table, db_type, flagger)
+    columns = get_columns(conn, table, db_type)
+
+    if identifier not in columns:
+        flagger.error("MISSING_IDENTIFIER_COLUMN", {
+            "table": table,
+            "expected": identifier,
+            "available": columns
+        })
+
+    fields = [a.field for a in pkg.aggregates if a.field != "*"] + \
+             [fc.field for fc in pkg.facets] + \
+             ([pkg.group_by] if pkg.group_by else [])
+    for field in fields:
+        if field not in columns:
+            flagger.error("UNKNOWN_COLUMN", {"table": table, "field": field})
+
+    predicate, params, _ = compile_search(pkg.search, conn, db_type, flagger, f"{table}.{identifier}")
+    select_aggs, aliases = _aggregate_sql(pkg.aggregates, flagger)
+    key = pkg.group_by
+    group_aggs = select_aggs or ["COUNT(*)"]
+    group_aliases = aliases or ["count"]
+
+    # Every branch returns the same columns:
+    # section, group key, one key per facet, aggregates, facet count
+    n_facets = len(pkg.facets)
+    n_values = len(group_aggs) if key else len(select_aggs)
+    branches = []
+    if select_aggs:
+        branches.append(f"SELECT {_branch(0, n_facets, n_values, values=select_aggs)} FROM filtered")
+    if key:
+        branches.append(
+            f"SELECT {_branch(1, n_facets, n_values, group_key=key, values=group_aggs)} "
+            f"FROM filtered GROUP BY {key}"
+        )
+    for idx, fc in enumerate(pkg.facets):
+        # The top-N subquery keeps its LIMIT; NULL padding stays outside it
+        branches.append(
+            f"SELECT {_branch(2 + idx, n_facets, n_values, facet=(idx, f'f{idx}.k'), count=f'f{idx}.n')} "
+            f"FROM (SELECT {fc.field} AS k, COUNT(*) AS n FROM filtered GROUP BY {fc.field} "
+            f"ORDER BY COUNT(*) DESC, {fc.field} LIMIT {int(fc.top)}) f{idx}"
+        )
+
+    totals, groups = {}, []
+    facets = {fc.field: [] for fc in pkg.facets}
+    if branches:
+        # SQLite, Postgres and MySQL materialize a CTE referenced more than once,
+        # and a CTE referenced once is a single scan anyway
+        needed = list(dict.fromkeys(fields)) or [identifier]
+        count_pos = 3 + n_facets + n_values
+        order = ["1", "2", f"{count_pos} DESC"] + [str(3 + i) for i in range(n_facets)]
+        query = (
+            f"WITH filtered AS (SELECT {', '.join(needed)} FROM {table} WHERE {predicate}) "
+            f"{' UNION ALL '.join(branches)} ORDER BY {', '.join(order)}"
+        )
+        cur = conn.cursor()
+        cur.execute(query, params)
+        for row in cur.fetchall():
+            section = row[0]
+            values = row[2 + n_facets:2 + n_facets + n_values]
+            if section == 0:
+                totals = dict(zip(aliases, values))
+            elif section == 1:
+                entry = {key: row[1]}
+                entry.update(zip(group_aliases, values))
+                groups.append(entry)
+            else:
+                idx = section - 2
+                facets[pkg.facets[idx].field].append((row[2 + idx], row[-1]))
+
+    logging.debug(f"[DEBUG] Report totals: {totals}")
+    logging.debug(f"[DEBUG] Report groups: {groups}")
+    logging.debug(f"[DEBUG] Report facets: {facets}")
+
+    return {
+        "table": table,
+        "totals": totals,
+        "groups": groups,
+        "facets": facets
+    }
+
+def _branch(section: int, n_facets: int, n_values: int, group_key: str = "NULL",
+            facet: tuple = None, values: list = None, count: str = "NULL") -> str:
+    facet_keys = ["NULL"] * n_facets
+    if facet is not None:
+        facet_keys[facet[0]] = facet[1]
+    return ", ".join([str(section), group_key] + facet_keys + (values or ["NULL"] * n_values) + [count])
+
+def _aggregate_sql(aggregates, flagger: Flagger) -> tuple[list[str], list[str]]:
+    exprs: list[str] = []
+    aliases: list[str] = []
+    for spec in aggregates:
+        if spec.op not in AGGREGATES:
+            flagger.error("UNKNOWN_AGGREGATE", {"op": spec.op, "field": spec.field})
+
+        if spec.op == "count":
+            exprs.append("COUNT(*)" if spec.field == "*" else f"COUNT({spec.field})")
+        elif spec.field == "*":
+            flagger.error("AGGREGATE_NEEDS_FIELD", {"op": spec.op})
+        elif spec.op == "count_distinct":
+            exprs.append(f"COUNT(DISTINCT {spec.field})")
+        else:
+            exprs.append(f"{spec.op.upper()}({spec.field})")
+
+        field_part = "all" if spec.field == "*" else spec.field
+        aliases.append(spec.alias or f"{spec.op}_{field_part}")
+    return exprs, aliases
@@ -0,0 +1,161 @@
+# tools/saved_search.py
+
+import json
+import logging
+from typing import Optional
+from tools.flagger import Flagger
+from tools.filter_sql import compile_search, universe_sql
+from tools.schema_introspect import get_tables
+from tools.setup import BATCH_LOG, SAVED_SEARCH_TABLES
+from utils.config import get_primary_identifier
+from utils.sql import chunked_in, placeholder
+from utils.types import SearchPackageFlat
+
+def require_saved_search_tables(conn, db_type: str, flagger: Flagger) -> None:
+    # Created by setup_tables(); never from here, to keep DDL out of writes
+    missing = [t for t in (BATCH_LOG,) + SAVED_SEARCH_TABLES if t not in get_tables(conn, db_type)]
+    if missing:
+        flagger.error("SETUP_REQUIRED", {"missing": missing, "run": "setup_tables"})
+
+def save_search(name: str, pkg, conn, db_type: str, flagger: Flagger) -> list[str]:
+    """
+    Store a search package and its full result set. Later refreshes
+    only re-check records that field_log shows as touched since.
+    """
+    require_saved_search_tables(conn, db_type, flagger)
+    ph = placeholder(db_type)
+    cur = conn.cursor()
+
+    last_batch = _latest_batch(cur)
+    matched = _evaluate(_compile(pkg, conn, db_type, flagger), conn, db_type, None)
+
+    cur.execute(f"DELETE FROM saved_search_result WHERE search_name = {ph}", (name,))
+    cur.execute(f"DELETE FROM saved_search WHERE search_name = {ph}", (name,))
+    cur.execute(
+        f"INSERT INTO saved_search (search_name, package, last_batch_id) VALUES ({ph}, {ph}, {ph})",
+        (name, json.dumps(pkg.to_dict()), last_batch)
+    )
+    _insert_results(cur, db_type, name, matched)
+    conn.commit()
+
+    logging.debug(f"[DEBUG] Saved search '{name}' with {len(matched)} results at batch {last_batch}")
+    return sorted(matched)
+
+def refresh_saved_search(name: str, conn, db_type: str, flagger: Flagger) -> dict:
+    """
+    Bring a saved search up to date with every batch logged after its
+    last_batch_id and return the identifiers that entered or left it.
+    Only writes that log a batch (process_batch, the server write routes)
+    are tracked.
+    """
+    require_saved_search_tables(conn, db_type, flagger)
+    ph = placeholder(db_type)
+    cur = conn.cursor()
+
+    cur.execute(f"SELECT package, last_batch_id FROM saved_search WHERE search_name = {ph}", (name,))
+    row = cur.fetchone()
+    if row is None:
+        flagger.error("SAVED_SEARCH_NOT_FOUND", {"name": name})
+    pkg = SearchPackageFlat.from_dict(json.loads(row[0]))
+    last_batch = row[1]
+
+    since = 0
+    if last_batch is not None:
+        cur.execute(f"SELECT batch_seq FROM batch_log WHERE batch_id = {ph}", (last_batch,))
+        seq_row = cur.fetchone()
+        if seq_row is None:
+            flagger.error("UNKNOWN_BATCH_ID", {"name": name, "batch_id": last_batch})
+        since = seq_row[0]
+
+    newest = _latest_batch(cur)
+    if newest == last_batch:
+        return {"name": name, "batch_id": last_batch, "added": [], "removed": []}
+
+    compiled = _compile(pkg, conn, db_type, flagger)
+    tables = compiled[2]
+    touched: set[str] = set()
+    if tables:
+        cur.execute(f"""
+            SELECT DISTINCT record_uuid FROM field_log
+            WHERE batch_id IN (SELECT batch_id FROM batch_log WHERE batch_seq > {ph})
+              AND table_name IN ({', '.join([ph] * len(tables))})
+        """, [since] + tables)
+        touched = {r[0] for r in cur.fetchall()}
+    logging.debug(f"[DEBUG] Saved search '{name}': {len(touched)} touched records since batch {last_batch}")
+
+    now_matching = _evaluate(compiled, conn, db_type, touched) if touched else set()
+    previously = _stored_subset(cur, db_type, name, touched)
+
+    added   = sorted(now_matching - previously)
+    removed = sorted(previously - now_matching)
+
+    chunked_in(cur, db_type,
+               f"DELETE FROM saved_search_result WHERE search_name = {ph} AND record_uuid IN",
+               removed, [name])
+    _insert_results(cur, db_type, name, added)
+    cur.execute(
+        f"UPDATE saved_search SET last_batch_id = {ph} WHERE search_name = {ph}",
+        (newest, name)
+    )
+    conn.commit()
+
+    return {"name": name, "batch_id": newest, "added": added, "removed": removed}
+
+def get_saved_results(name: str, conn, db_type: str) -> list[str]:
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT record_uuid FROM saved_search_result WHERE search_name = {placeholder(db_type)} ORDER BY record_uuid",
+        (name,)
+    )
+    return [r[0] for r in cur.fetchall()]
+
+def drop_saved_search(name: str, conn, db_type: str) -> None:
+    ph = placeholder(db_type)
+    cur = conn.cursor()
+    cur.execute(f"DELETE FROM saved_search_result WHERE search_name = {ph}", (name,))
+    cur.execute(f"DELETE FROM saved_search WHERE search_name = {ph}", (name,))
+    conn.commit()
+
+
+# --- Helpers ---
+
+def _latest_batch(cur) -> Optional[str]:
+    cur.execute("SELECT batch_id FROM batch_log ORDER BY batch_seq DESC LIMIT 1")
+    row = cur.fetchone()
+    return row[0] if row else None
+
+def _compile(pkg, conn, db_type: str, flagger: Flagger) -> tuple[str, list, list[str]]:
+    identifier = get_primary_identifier()
+    return compile_search(pkg, conn, db_type, flagger, f"u.{identifier}")
+
+def _evaluate(compiled, conn, db_type: str, candidates: Optional[set]) -> set[str]:
+    # Full evaluation when candidates is None, else only those identifiers
+    identifier = get_primary_identifier()
+    predicate, params, tables = compiled
+    if not tables:
+        return set()
+    base = f"SELECT u.{identifier} FROM ({universe_sql(tables)}) u WHERE {predicate}"
+    cur = conn.cursor()
+
+    if candidates is None:
+        cur.execute(base, params)
+        return {r[0] for r in cur.fetchall()}
+
+    rows = chunked_in(cur, db_type, f"{base} AND u.{identifier} IN", candidates, params)
+    return {r[0] for r in rows}
+
+def _stored_subset(cur, db_type: str, name: str, candidates: set) -> set[str]:
+    rows = chunked_in(cur, db_type,
+                      f"SELECT record_uuid FROM saved_search_result "
+                      f"WHERE search_name = {placeholder(db_type)} AND record_uuid IN",
+                      candidates, [name])
+    return {r[0] for r in rows}
+
+def _insert_results(cur, db_type: str, name: str, uuids) -> None:
+    ph = placeholder(db_type)
+    rows = [(name, u) for u in uuids]
+    if rows:
+        cur.executemany(
+            f"INSERT INTO saved_search_result (search_name, record_uuid) VALUES ({ph}, {ph})",
+            rows
+        )
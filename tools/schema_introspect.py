@@ -1,8 +1,85 @@
 # tools/schema_introspect.py
 
+import threading
+from typing import Optional
 from tools.flagger import Flagger
 
-SKIP_PK_CHECK = {"sqlite_sequence", "field_log"}
+SKIP_PK_CHECK = {
+    "sqlite_sequence", "field_log", "field_tokens", "field_token_state",
+    "batch_log", "saved_search", "saved_search_result"
+}
+
+# Column/table metadata cache for long-running processes; None ⇒ disabled.
+# Request threads share it, so every access goes through _cache_lock.
+_schema_cache: Optional[dict] = None
+_schema_version = None
+_schema_generation = 0     # bumped on every invalidation; lets other caches (plans) notice
+_cache_lock = threading.RLock()
+
+def schema_generation() -> int:
+    return _schema_generation
+
+def enable_schema_cache() -> None:
+    global _schema_cache
+    with _cache_lock:
+        if _schema_cache is None:
+            _schema_cache = {}
+
+def invalidate_schema_cache() -> None:
+    global _schema_generation
+    with _cache_lock:
+        _schema_generation += 1
+        if _schema_cache is not None:
+            _schema_cache.clear()
+
+def schema_version(conn, db_type: str):
+    """
+    A value that changes whenever a table or column is added, dropped or
+    retyped. SQLite keeps a counter; Postgres and MySQL get a fingerprint
+    of the column catalog, one small query per check.
+    """
+    if db_type == "sqlite":
+        return conn.execute("PRAGMA schema_version").fetchone()[0]
+    cur = conn.cursor()
+    if db_type == "postgres":
+        cur.execute("""
+            SELECT COUNT(*), md5(COALESCE(string_agg(
+                table_name || '.' || column_name || ':' || data_type, ','
+                ORDER BY table_name, column_name), ''))
+            FROM information_schema.columns
+            WHERE table_schema = 'public'
+        """)
+    elif db_type == "mysql":
+        cur.execute("""
+            SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('.', TABLE_NAME, COLUMN_NAME, COLUMN_TYPE))), 0)
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE()
+        """)
+    else:
+        return None
+    return tuple(cur.fetchone())
+
+def check_schema_version(conn, db_type: str) -> None:
+    global _schema_version
+    version = schema_version(conn, db_type)
+    with _cache_lock:
+        if version != _schema_version:
+            invalidate_schema_cache()
+            _schema_version = version
+
+def _cached(key, load) -> list:
+    # Load outside the lock; a value loaded across an invalidation is not kept
+    with _cache_lock:
+        enabled = _schema_cache is not None
+        value = _schema_cache.get(key) if enabled else None
+        generation = _schema_generation
+    if value is None:
+        value = load()
+        if enabled:
+            with _cache_lock:
+                if _schema_cache is not None and generation == _schema_generation:
+                    _schema_cache[key] = value
+    return list(value)
 
 def get_primary_key_columns(conn, table: str, db_type: str) -> list[str]:
     if db_type == "sqlite":
@@ -44,6 +121,9 @@ def _get_mysql_pk(conn, table: str) -> list[str]:
     return [row[0] for row in cur.fetchall()]
 
 def get_tables(conn, db_type: str) -> list[str]:
+    return _cached((db_type, "*tables*"), lambda: _get_tables(conn, db_type))
+
+def _get_tables(conn, db_type: str) -> list[str]:
     if db_type == "sqlite":
         cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
         return [r[0] for r in cur.fetchall() if not r[0].startswith("sqlite_")]
@@ -62,6 +142,11 @@ def get_tables(conn, db_type: str) -> list[str]:
         return [r[0] for r in cur.fetchall()]
     return []
 
+def require_table(conn, table: str, db_type: str, flagger: Flagger) -> None:
+    # Table names end up in SQL text, so only known tables may get that far
+    if table not in get_tables(conn, db_type):
+        flagger.error("UNKNOWN_TABLE", {"table": table})
+
 def validate_primary_identifier(table: str, conn, db_type: str, expected_field: str, flagger: Flagger):
     if table in SKIP_PK_CHECK:
         return
@@ -74,6 +159,9 @@ def validate_primary_identifier(table: str, conn, db_type: str, expected_field:
         })
 
 def get_columns(conn, table: str, db_type: str) -> list[str]:
+    return _cached((db_type, table), lambda: _get_columns(conn, table, db_type))
+
+def _get_columns(conn, table: str, db_type: str) -> list[str]:
     if db_type == "sqlite":
         cur = conn.execute(f"PRAGMA table_info({table})")
         return [row[1] for row in cur.fetchall()]
@@ -82,3 +170,8 @@ def get_columns(conn, table: str, db_type: str) -> list[str]:
         cur = conn.cursor()
         cur.execute(query)
         return [desc[0] for desc in cur.description]
+
+def get_all_identifiers(conn, table: str, identifier: str) -> set[str]:
+    cur = conn.cursor()
+    cur.execute(f"SELECT {identifier} FROM {table}")
+    return {row[0] for row in cur.fetchall()}
@@ -1,58 +1,78 @@
 import logging
 from typing import Optional, Set
 from tools.flagger import Flagger
-from tools.schema_introspect import get_columns, get_all_identifiers
+from tools.schema_introspect import get_columns, get_all_identifiers, require_table
+from tools.filter_sql import compile_filter
+from utils.types import FlatFilter
 from utils.config import get_primary_identifier
 
 def search_records(pkg, conn, db_type: str, flagger: Flagger,
                    delimiter: Optional[str] = None,
                    join_style: str = "clean") -> dict:
     logging.debug(f"[DEBUG] search_records called with filters: {pkg.filters}")
+    results = [
+        (table, clauses, search_table(conn, db_type, flagger, table, clauses))
+        for table, clauses in pkg.filters.items()
+    ]
+    return merge_table_results(results)
+
+def search_table(conn, db_type: str, flagger: Flagger, table: str, clauses: list) -> Set[str]:
+    # Tables are independent until merged, so callers may evaluate them concurrently
+    logging.debug(f"[DEBUG] Processing table '{table}' with clauses: {clauses}")
+    universe = table_universe(conn, db_type, flagger, table)
+    matched = [evaluate_clause(conn, db_type, flagger, table, clause) for clause in clauses]
+    return combine_clauses(table, clauses, matched, universe)
+
+def table_universe(conn, db_type: str, flagger: Flagger, table: str) -> Set[str]:
     identifier = get_primary_identifier()
-    matches: dict[str, list[dict]] = {}
-    combined_set: Optional[Set[str]] = None
+    require_table(conn, table, db_type, flagger)
+    columns = get_columns(conn, table, db_type)
 
-    for table, clauses in pkg.filters.items():
-        logging.debug(f"[DEBUG] Processing table '{table}' with clauses: {clauses}")
-        columns = get_columns(conn, table, db_type)
+    if identifier not in columns:
+        flagger.error("MISSING_IDENTIFIER_COLUMN", {
+            "table": table,
+            "expected": identifier,
+            "available": columns
+        })
 
-        if identifier not in columns:
-            flagger.error("MISSING_IDENTIFIER_COLUMN", {
-                "table": table,
-                "expected": identifier,
-                "available": columns
-            })
+    universe = get_all_identifiers(conn, table, identifier)
+    logging.debug(f"[DEBUG] Universe for table '{table}': {universe}")
+    return universe
 
-        universe = get_all_identifiers(conn, table, identifier)
-        logging.debug(f"[DEBUG] Universe for table '{table}': {universe}")
+def combine_clauses(table: str, clauses: list, matched: list[Set[str]], universe: Set[str]) -> Set[str]:
+    # Clause matches are independent of each other; only this step depends on their order
+    clause_sets: list[tuple[Set[str], str]] = []
+    for clause, clause_matched in zip(clauses, matched):
+        logic = clause.get('logic', 'and').lower()
+        logging.debug(
+            f"[DEBUG] Clause match ({table}.{clause['field']} {clause['operator']} "
+            f"'{clause['value']}'): {clause_matched}"
+        )
 
-        clause_sets: list[tuple[Set[str], str]] = []
-        for clause in clauses:
-            field = clause['field']
-            op    = clause['operator']
-            value = clause['value']
-            logic = clause.get('logic', 'and').lower()
+        if logic in ('nand', 'nor'):
+            inverted = universe - clause_matched
+            logging.debug(f"[DEBUG] Inverted set for logic '{logic}': {inverted}")
+            clause_matched = inverted
 
-            matched = _evaluate_clause(conn, table, field, op, value)
-            logging.debug(f"[DEBUG] Clause match ({table}.{field} {op} '{value}'): {matched}")
+        clause_sets.append((clause_matched, logic))
 
-            if logic in ('nand', 'nor'):
-                inverted = universe - matched
-                logging.debug(f"[DEBUG] Inverted set for logic '{logic}': {inverted}")
-                matched = inverted
+    # Combine per-table clauses
+    table_result = clause_sets[0][0]
+    for idx, (s, logic) in enumerate(clause_sets[1:], start=1):
+        prev = table_result
+        if logic == 'or':
+            table_result = prev.union(s)
+        else:
+            table_result = prev.intersection(s)
+        logging.debug(f"[DEBUG] After applying '{logic}' at clause {idx}: {table_result}")
 
-            clause_sets.append((matched, logic))
+    return table_result
 
-        # Combine per-table clauses
-        table_result = clause_sets[0][0]
-        for idx, (s, logic) in enumerate(clause_sets[1:], start=1):
-            prev = table_result
-            if logic == 'or':
-                table_result = prev.union(s)
-            else:
-                table_result = prev.intersection(s)
-            logging.debug(f"[DEBUG] After applying '{logic}' at clause {idx}: {table_result}")
+def merge_table_results(results: list[tuple[str, list, Set[str]]]) -> dict:
+    matches: dict[str, list[dict]] = {}
+    combined_set: Optional[Set[str]] = None
 
+    for table, clauses, table_result in results:
         # Merge into the global combined_set
         if combined_set is None:
             combined_set = table_result
@@ -72,6 +92,17 @@ def search_records(pkg, conn, db_type: str, flagger: Flagger,
     logging.debug(f"[DEBUG] Matches dict: {matches}")
     return matches
 
-def _evaluate_clause(conn, table, field, op, value):
-    # TODO: translate into SQL and return set of UUIDs
-    ...
+def evaluate_clause(conn, db_type: str, flagger: Flagger, table: str, clause: dict) -> Set[str]:
+    f = FlatFilter(
+        table    = table,
+        field    = clause['field'],
+        operator = clause['operator'],
+        value    = clause['value'],
+        logic    = clause.get('logic', 'and').lower(),
+        index_by = clause.get('index_by'),
+        position = clause.get('position', 'none')
+    )
+    sql, params, _ = compile_filter(f, conn, db_type, flagger, get_primary_identifier())
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    return {row[0] for row in cur.fetchall()}
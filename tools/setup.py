@@ -0,0 +1,54 @@
+# tools/setup.py
+#
+# Setup: run setup_tables() once per database (it is safe to re-run) to
+# create the engine's own side tables: batch_log for sequencing batches,
+# and saved_search / saved_search_result. Write paths never run DDL
+# themselves, because MySQL commits implicitly on it. The token index
+# tables come from rebuild_token_index() instead.
+
+import logging
+from tools.schema_introspect import get_tables, invalidate_schema_cache
+
+BATCH_LOG = "batch_log"
+SAVED_SEARCH_TABLES = ("saved_search", "saved_search_result")
+
+def setup_tables(conn, db_type: str) -> list[str]:
+    """
+    Create any missing side tables and commit. Returns the tables created.
+    """
+    existing = set(get_tables(conn, db_type))
+    cur = conn.cursor()
+
+    if db_type == "sqlite":
+        seq = "batch_seq INTEGER PRIMARY KEY AUTOINCREMENT"
+    elif db_type == "postgres":
+        seq = "batch_seq BIGSERIAL PRIMARY KEY"
+    else:
+        seq = "batch_seq BIGINT AUTO_INCREMENT PRIMARY KEY"
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {BATCH_LOG} (
+            {seq},
+            batch_id   VARCHAR(64) NOT NULL UNIQUE,
+            created_at TIMESTAMP   DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS saved_search (
+            search_name   VARCHAR(128) NOT NULL PRIMARY KEY,
+            package       TEXT         NOT NULL,
+            last_batch_id VARCHAR(64)
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS saved_search_result (
+            search_name VARCHAR(128) NOT NULL,
+            record_uuid VARCHAR(64)  NOT NULL,
+            PRIMARY KEY (search_name, record_uuid)
+        )
+    """)
+    conn.commit()
+    invalidate_schema_cache()
+
+    created = [t for t in (BATCH_LOG,) + SAVED_SEARCH_TABLES if t not in existing]
+    logging.debug(f"[DEBUG] Side tables created: {created}")
+    return created
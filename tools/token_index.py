@@ -0,0 +1,187 @@
+# tools/token_index.py
+#
+# Setup: list fields under "token_index" in the settings, then run
+# rebuild_token_index() once (and again whenever that list changes).
+# Until a field has been rebuilt, searches use the plain column scan and
+# writes leave its tokens alone.
+
+import logging
+from tools.flagger import Flagger
+from tools.schema_introspect import get_columns, get_tables, invalidate_schema_cache
+from utils.config import get_primary_identifier, get_token_index_fields
+from utils.sql import chunked_in, placeholder
+
+TOKEN_TABLE = "field_tokens"
+STATE_TABLE = "field_token_state"
+
+def split_tokens(value, delimiter: str) -> list[str]:
+    # One space either side of a delimiter is dropped; filter_sql's token
+    # scan applies the same REPLACEs in SQL, so both give the same answer
+    if value is None:
+        return []
+    text = f"{delimiter}{value}{delimiter}"
+    text = text.replace(f" {delimiter}", delimiter).replace(f"{delimiter} ", delimiter)
+    return [t for t in text.split(delimiter) if t]
+
+def built_token_fields(conn, db_type: str) -> dict:
+    """
+    {(table, field): delimiter} for configured fields whose tokens have
+    been backfilled by rebuild_token_index with the same delimiter.
+    """
+    configured = get_token_index_fields()
+    if not configured or STATE_TABLE not in get_tables(conn, db_type):
+        return {}
+    cur = conn.cursor()
+    cur.execute(f"SELECT table_name, field_name, delimiter FROM {STATE_TABLE}")
+    return {
+        (t, f): d for t, f, d in cur.fetchall()
+        if configured.get((t, f)) == d
+    }
+
+def indexed_fields(conn, db_type: str, table: str) -> dict:
+    # {field: delimiter} for the built token fields of one table
+    return {f: d for (t, f), d in built_token_fields(conn, db_type).items() if t == table}
+
+def ensure_token_table(conn, db_type: str) -> None:
+    # DDL lives here only; MySQL commits implicitly on it, so keep it out of write paths
+    cur = conn.cursor()
+    columns = """
+        record_uuid VARCHAR(64)  NOT NULL,
+        table_name  VARCHAR(128) NOT NULL,
+        field_name  VARCHAR(128) NOT NULL,
+        token       VARCHAR(255) NOT NULL,
+        ordinal     INTEGER      NOT NULL,
+        PRIMARY KEY (record_uuid, table_name, field_name, ordinal)
+    """
+    if db_type == "mysql":
+        # MySQL has no CREATE INDEX IF NOT EXISTS, so declare it inline
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {TOKEN_TABLE} ({columns},
+                INDEX idx_{TOKEN_TABLE}_lookup (table_name, field_name, token)
+            )
+        """)
+    else:
+        cur.execute(f"CREATE TABLE IF NOT EXISTS {TOKEN_TABLE} ({columns})")
+        cur.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{TOKEN_TABLE}_lookup
+            ON {TOKEN_TABLE} (table_name, field_name, token)
+        """)
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            table_name VARCHAR(128) NOT NULL,
+            field_name VARCHAR(128) NOT NULL,
+            delimiter  VARCHAR(16)  NOT NULL,
+            PRIMARY KEY (table_name, field_name)
+        )
+    """)
+
+def index_record(cur, db_type: str, table: str, uuid_val: str, record: dict, fields: dict) -> None:
+    """
+    Replace the tokens of every indexed field (from `fields`) present in `record`.
+    """
+    ph = placeholder(db_type)
+    for field, delimiter in fields.items():
+        if field not in record:
+            continue
+        cur.execute(
+            f"DELETE FROM {TOKEN_TABLE} WHERE record_uuid = {ph} AND table_name = {ph} AND field_name = {ph}",
+            (uuid_val, table, field)
+        )
+        rows = [
+            (uuid_val, table, field, token, ordinal)
+            for ordinal, token in enumerate(split_tokens(record[field], delimiter))
+        ]
+        if rows:
+            cur.executemany(
+                f"INSERT INTO {TOKEN_TABLE} (record_uuid, table_name, field_name, token, ordinal) "
+                f"VALUES ({ph}, {ph}, {ph}, {ph}, {ph})",
+                rows
+            )
+
+def drop_record_tokens(cur, db_type: str, table: str, uuid_val: str) -> None:
+    ph = placeholder(db_type)
+    cur.execute(
+        f"DELETE FROM {TOKEN_TABLE} WHERE record_uuid = {ph} AND table_name = {ph}",
+        (uuid_val, table)
+    )
+
+def rebuild_token_index(conn, db_type: str, flagger: Flagger) -> int:
+    """
+    Create the token tables if needed and re-split every configured
+    field from scratch. Returns the number of records indexed.
+    """
+    identifier = get_primary_identifier()
+    configured = get_token_index_fields()
+    ensure_token_table(conn, db_type)
+    cur = conn.cursor()
+    ph = placeholder(db_type)
+    count = 0
+
+    tables = set(get_tables(conn, db_type))
+    for table in sorted({t for (t, _) in configured}):
+        fields = {f: d for (t, f), d in configured.items() if t == table}
+        if table not in tables:
+            flagger.error("UNKNOWN_TABLE", {"table": table})
+        columns = get_columns(conn, table, db_type)
+        for field in fields:
+            if field not in columns:
+                flagger.error("UNKNOWN_COLUMN", {"table": table, "field": field})
+
+        cur.execute(f"DELETE FROM {TOKEN_TABLE} WHERE table_name = {ph}", (table,))
+        read_cur = conn.cursor()
+        read_cur.execute(f"SELECT {identifier}, {', '.join(fields)} FROM {table}")
+        for row in read_cur.fetchall():
+            index_record(cur, db_type, table, row[0], dict(zip(fields, row[1:])), fields)
+            count += 1
+
+    cur.execute(f"DELETE FROM {STATE_TABLE}")
+    cur.executemany(
+        f"INSERT INTO {STATE_TABLE} (table_name, field_name, delimiter) VALUES ({ph}, {ph}, {ph})",
+        [(t, f, d) for (t, f), d in configured.items()]
+    )
+    conn.commit()
+    invalidate_schema_cache()
+    logging.debug(f"[DEBUG] Rebuilt token index for {count} records")
+    return count
+
+def token_select(db_type: str, op: str) -> str:
+    # Subquery yielding identifiers whose token matches; params: table, field, value
+    ph = placeholder(db_type)
+    match = f"token = {ph}" if op == "equals" else f"token LIKE {ph} ESCAPE '!'"
+    return (
+        f"SELECT record_uuid FROM {TOKEN_TABLE} "
+        f"WHERE table_name = {ph} AND field_name = {ph} AND {match}"
+    )
+
+def read_tokens(conn, db_type: str, table: str, field: str, uuids: list[str]) -> dict:
+    """
+    Fetch the pre-split tokens for a set of records, in original order.
+    """
+    ph = placeholder(db_type)
+    rows = chunked_in(conn.cursor(), db_type,
+                      f"SELECT record_uuid, ordinal, token FROM {TOKEN_TABLE} "
+                      f"WHERE table_name = {ph} AND field_name = {ph} AND record_uuid IN",
+                      uuids, [table, field])
+    out: dict[str, list[str]] = {}
+    for uuid_val, _, token in sorted(rows, key=lambda r: (r[0], r[1])):
+        out.setdefault(uuid_val, []).append(token)
+    return out
+
+def tokens_for_matches(conn, db_type: str, matches: dict) -> dict:
+    """
+    Pre-split tokens for every index_by clause in search_records' matches,
+    shaped for format_search_results(tokens=...). Fields without a built
+    index are left out, so the formatter splits those itself.
+    """
+    built = built_token_fields(conn, db_type)
+    wanted: dict[tuple, set] = {}
+    for uuid_val, hits in matches.items():
+        for hit in hits:
+            for clause in hit['clauses']:
+                key = (hit['table'], clause['field'])
+                if clause.get('index_by') and built.get(key) == clause['index_by']:
+                    wanted.setdefault(key, set()).add(uuid_val)
+    return {
+        (table, field): read_tokens(conn, db_type, table, field, sorted(uuids))
+        for (table, field), uuids in wanted.items()
+    }
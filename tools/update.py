@@ -2,12 +2,14 @@
 
 from typing import Optional
 from tools.flagger import Flagger
-from tools.schema_introspect import get_columns
+from tools.schema_introspect import get_columns, require_table
+from tools.token_index import index_record, indexed_fields
 from utils.config import get_primary_identifier
 
 def update_records(pkg, conn, db_type: str, flagger: Flagger, batch_id: Optional[str] = None) -> bool:
     table = pkg.table
     identifier = get_primary_identifier()
+    require_table(conn, table, db_type, flagger)
     columns = get_columns(conn, table, db_type)
 
     if identifier not in columns:
@@ -17,6 +19,11 @@ def update_records(pkg, conn, db_type: str, flagger: Flagger, batch_id: Optional
             "available": columns
         })
 
+    token_fields = indexed_fields(conn, db_type, table)
+
+    column_set = set(columns)
+    checked: set[frozenset] = set()
+
     cur = conn.cursor()
 
     for update in pkg.records:
@@ -42,13 +49,15 @@ def update_records(pkg, conn, db_type: str, flagger: Flagger, batch_id: Optional
 
         old_data = dict(zip([desc[0] for desc in cur.description], old_row))
 
-        # Validate target fields
-        for field in update:
-            if field != identifier and field not in columns:
+        # Validate target fields, once per distinct set of fields
+        signature = frozenset(update)
+        if signature not in checked:
+            for field in signature - column_set:
                 flagger.error("UNKNOWN_COLUMN", {
                     "table": table,
                     "field": field
                 })
+            checked.add(signature)
 
         # Build update clause
         fields = [f for f in update if f != identifier]
@@ -59,6 +68,9 @@ def update_records(pkg, conn, db_type: str, flagger: Flagger, batch_id: Optional
 
         cur.execute(query, values)
 
+        if token_fields:
+            index_record(cur, db_type, table, uuid_val, {f: update[f] for f in fields}, token_fields)
+
         # Audit changed fields only
         if batch_id:
             for field in fields:
@@ -0,0 +1,191 @@
+# tools/validate.py
+
+import logging
+import re
+from tools.flagger import Flagger
+from tools.schema_introspect import get_columns, get_tables
+from utils.config import get_primary_identifier
+from utils.sql import chunked_in
+
+UUID_RE = re.compile(
+    r"(?:urn:)?(?:uuid:)?\{?[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}\}?",
+    re.IGNORECASE
+)
+OP_TYPES = ("create", "update", "delete")
+
+def is_uuid(val) -> bool:
+    # fullmatch: "$" would also accept a trailing newline, which uuid.UUID rejects
+    return UUID_RE.fullmatch(str(val)) is not None
+
+class ValidationReport:
+    """
+    Collects every problem found in a payload instead of stopping at the
+    first, so a client can fix them all at once. Only validation uses it;
+    Flagger.error always raises.
+    """
+    def __init__(self):
+        self.errors: list[tuple[str, dict]] = []
+        self.warnings: list[tuple[str, dict]] = []
+
+    def error(self, code: str, context: dict) -> None:
+        self.errors.append((code, context))
+
+    def warning(self, code: str, context: dict) -> None:
+        self.warnings.append((code, context))
+
+    def get_errors(self) -> list[tuple[str, dict]]:
+        return self.errors
+
+    def get_warnings(self) -> list[tuple[str, dict]]:
+        return self.warnings
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+def check_records(kind: str, table: str, records: list[dict], conn, db_type: str) -> ValidationReport:
+    """
+    Check a create/update/delete payload without writing anything.
+    """
+    report = ValidationReport()
+    _check_table_records(report, kind, table, records, conn, db_type, {}, set(get_tables(conn, db_type)))
+    return report
+
+def check_batch(pkg, conn, db_type: str) -> ValidationReport:
+    """
+    Check every group of a batch package without writing anything.
+    Records are bucketed per (kind, table) so each table's schema is
+    read once.
+    """
+    report = ValidationReport()
+    identifier = get_primary_identifier()
+    buckets: dict[tuple[str, str], list[dict]] = {}
+
+    for group_name, ops in pkg.groups.items():
+        if isinstance(ops, dict) and "type" in ops:
+            missing = [k for k in ("table", "records") if k not in ops]
+            if missing:
+                report.error("INVALID_OPERATION_GROUP", {"group": group_name, "missing": missing})
+                continue
+            if ops["type"] not in OP_TYPES:
+                report.error("UNKNOWN_OPERATION_TYPE", {"group": group_name, "op_type": ops["type"]})
+                continue
+            if not isinstance(ops["table"], str) or not isinstance(ops["records"], list):
+                report.error("INVALID_OPERATION_GROUP", {
+                    "group": group_name,
+                    "expected": {"table": "str", "records": "list"}
+                })
+                continue
+            buckets.setdefault((ops["type"], ops["table"]), []).extend(ops["records"])
+            continue
+
+        is_update = is_uuid(group_name)
+        if not isinstance(ops, list):
+            report.error("INVALID_UPDATE_GROUP" if is_update else "INVALID_CREATE_GROUP", {
+                "group": group_name,
+                "expected": "list of change ops",
+                "actual": type(ops).__name__
+            })
+            continue
+
+        for idx, op in enumerate(ops):
+            if not isinstance(op, dict) or not isinstance(op.get("table"), str) \
+                    or not isinstance(op.get("fields"), dict):
+                report.error("INVALID_CHANGE_OP", {"group": group_name, "op": idx})
+                continue
+            if is_update:
+                if not isinstance(op.get("identifier"), str):
+                    report.error("INVALID_CHANGE_OP", {"group": group_name, "op": idx, "missing": ["identifier"]})
+                    continue
+                row = dict(op["fields"])
+                row[op["identifier"]] = group_name
+                buckets.setdefault(("update", op["table"]), []).append(row)
+            else:
+                row = dict(op["fields"])
+                row[identifier] = group_name
+                buckets.setdefault(("create", op["table"]), []).append(row)
+
+    # Records created earlier in the same batch may be updated/deleted later in it
+    pending = {
+        r[identifier] for (kind, _), records in buckets.items() if kind == "create"
+        for r in records if isinstance(r, dict) and identifier in r
+    }
+    tables = set(get_tables(conn, db_type))
+    column_sets: dict[str, set] = {}
+    for (kind, table), records in buckets.items():
+        _check_table_records(report, kind, table, records, conn, db_type, column_sets, tables, pending)
+
+    logging.debug(f"[DEBUG] Batch validation: {len(report.errors)} errors, {len(report.warnings)} warnings")
+    return report
+
+def validate_records(kind: str, table: str, records: list[dict], conn, db_type: str, flagger: Flagger) -> None:
+    """
+    Gate for the write paths: one VALIDATION_FAILED carrying every error.
+    Warnings are left to the write itself so they are not reported twice.
+    """
+    report = check_records(kind, table, records, conn, db_type)
+    if not report.valid:
+        flagger.error("VALIDATION_FAILED", {"errors": report.errors})
+
+def validate_batch(pkg, conn, db_type: str, flagger: Flagger) -> None:
+    # Same gate for a whole batch, run before process_batch opens its transaction
+    report = check_batch(pkg, conn, db_type)
+    if not report.valid:
+        flagger.error("VALIDATION_FAILED", {"errors": report.errors})
+
+
+# --- Helpers ---
+
+def _check_table_records(report: ValidationReport, kind: str, table: str, records: list[dict],
+                         conn, db_type: str, column_sets: dict, tables: set,
+                         pending: set = frozenset()) -> None:
+    identifier = get_primary_identifier()
+    if table not in tables:
+        report.error("UNKNOWN_TABLE", {"table": table})
+        return
+
+    if table not in column_sets:
+        column_sets[table] = set(get_columns(conn, table, db_type))
+    columns = column_sets[table]
+
+    if identifier not in columns:
+        report.error("MISSING_IDENTIFIER_COLUMN", {
+            "table": table,
+            "expected": identifier,
+            "available": sorted(columns)
+        })
+        return
+
+    # Each distinct set of keys is checked against the schema once
+    signatures: set[frozenset] = set()
+    uuids: list = []
+    for idx, record in enumerate(records):
+        if not isinstance(record, dict):
+            report.error("INVALID_RECORD", {"table": table, "index": idx})
+            continue
+        sig = frozenset(record)
+        if sig not in signatures:
+            signatures.add(sig)
+            for field in sorted(sig - columns):
+                report.error("UNKNOWN_COLUMN", {"table": table, "field": field})
+
+        if kind in ("update", "delete"):
+            if identifier not in record:
+                report.error("MISSING_IDENTIFIER_IN_RECORD", {"table": table, "index": idx})
+            else:
+                uuids.append(record[identifier])
+
+    if uuids:
+        missing = set(uuids) - pending - _existing(conn, db_type, table, uuids)
+        for uuid_val in sorted(missing, key=str):
+            ctx = {"table": table, "identifier": identifier, "value": uuid_val}
+            if kind == "update":
+                report.error("RECORD_NOT_FOUND", ctx)
+            else:
+                report.warning("DELETE_RECORD_NOT_FOUND", ctx)
+
+def _existing(conn, db_type: str, table: str, uuids: list) -> set:
+    identifier = get_primary_identifier()
+    rows = chunked_in(conn.cursor(), db_type,
+                      f"SELECT {identifier} FROM {table} WHERE {identifier} IN", set(uuids))
+    return {r[0] for r in rows}
@@ -24,3 +24,37 @@ def get_primary_identifier():
 
 def get_db_path():
     return load_settings().get("connection", {}).get("path", "data/database.db")
+
+def get_token_index_fields() -> dict:
+    # {(table, field): delimiter} for every field with a managed token index
+    out = {}
+    for entry in load_settings().get("token_index", []):
+        out[(entry["table"], entry["field"])] = entry.get("delimiter", ";")
+    return out
+
+def get_server_settings() -> dict:
+    server = load_settings().get("server", {})
+    return {
+        "host":      server.get("host", "127.0.0.1"),
+        "port":      server.get("port", 8765),
+        "socket":    server.get("socket"),
+        "pool_size": server.get("pool_size", 4)
+    }
+
+def get_working_copy_settings() -> dict:
+    wc = load_settings().get("working_copy", {})
+    return {
+        "mode":      wc.get("mode", "memory"),
+        "mmap_size": wc.get("mmap_size", 256 * 1024 * 1024),
+        "indexes":   wc.get("indexes", [])
+    }
+
+def get_plan_cache_size() -> int:
+    return load_settings().get("plan_cache_size", 256)
+
+def get_async_settings() -> dict:
+    aio = load_settings().get("async", {})
+    return {
+        "pool_size": aio.get("pool_size", 8),
+        "timeout":   aio.get("timeout")
+    }
@@ -1,21 +1,30 @@
 # utils/connect.py
 
+import logging
+import os
+import queue
 import sqlite3
-import psycopg2
-import mysql.connector
+import tempfile
+from contextlib import contextmanager
+from typing import Optional
 
-from utils.config import get_settings, get_primary_identifier
-from tools.schema_introspect import get_tables, validate_primary_identifier, get_columns
+from utils.config import get_settings, get_primary_identifier, get_working_copy_settings
+from utils.sql import chunked_in
+from tools.schema_introspect import get_tables, validate_primary_identifier, get_columns, schema_version
 from tools.flagger import Flagger
 
-def get_connection():
+def get_connection(shared: bool = False):
+    # Drivers are imported only for the backend actually configured
     settings = get_settings()
     db_type = settings.get("database_type", "sqlite").lower()
     conn_info = settings.get("connection", {})
 
     if db_type == "sqlite":
-        return sqlite3.connect(conn_info.get("path", "data/database.db"))
+        # shared ⇒ the connection may be handed between threads (one at a time)
+        return sqlite3.connect(conn_info.get("path", "data/database.db"),
+                               check_same_thread=not shared)
     elif db_type == "postgres":
+        import psycopg2
         return psycopg2.connect(
             host=conn_info["host"],
             port=conn_info.get("port", 5432),
@@ -24,6 +33,7 @@ def get_connection():
             dbname=conn_info["database"]
         )
     elif db_type == "mysql":
+        import mysql.connector
         return mysql.connector.connect(
             host=conn_info["host"],
             port=conn_info.get("port", 3306),
@@ -43,3 +53,187 @@ def get_columns(conn, table: str, db_type: str) -> list[str]:
     # This is now forwarded to schema_introspect, kept for backward compatibility
     from tools.schema_introspect import get_columns as get_cols
     return get_cols(conn, table, db_type)
+
+def get_db_type() -> str:
+    return get_settings().get("database_type", "sqlite").lower()
+
+class ConnectionPool:
+    """
+    Fixed-size pool of open connections for long-running processes.
+    acquire() blocks until a connection is free.
+    """
+    def __init__(self, size: int = 4):
+        self.size = size
+        self.db_type = get_db_type()
+        self._idle: queue.Queue = queue.Queue()
+        for _ in range(size):
+            self._idle.put(get_connection(shared=True))
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None):
+        # Always end the transaction before handing the connection back, so
+        # read-only callers don't leave it idle in transaction (a no-op after commit)
+        conn = self._idle.get(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            try:
+                conn.rollback()
+            finally:
+                self._idle.put(conn)
+
+    def close(self) -> None:
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+class WorkingCopy:
+    """
+    Read-only snapshot of the configured SQLite database for report
+    sessions, taken with the SQLite backup API. Pass `conn` (db_type
+    "sqlite") to search_records/read_records/build_report.
+
+    mode "memory" copies into :memory:; mode "mmap" copies into a temp
+    file opened read-only with mmap enabled. Report-specific indexes
+    are built on the copy only.
+    """
+    def __init__(self, mode: Optional[str] = None, indexes: Optional[list] = None):
+        if get_db_type() != "sqlite":
+            raise ValueError(f"Working copies require sqlite, not {get_db_type()}")
+        settings = get_working_copy_settings()
+        self.mode = mode or settings["mode"]
+        if self.mode not in ("memory", "mmap"):
+            raise ValueError(f"Unsupported working copy mode: {self.mode}")
+        self.mmap_size = settings["mmap_size"]
+        self.indexes = indexes if indexes is not None else settings["indexes"]
+        self.conn = None
+        self._path = None
+        self._batch_seq = 0
+        self._schema_version = None
+        self.refresh(full=True)
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Bring the copy up to date. Incremental refreshes replay the rows
+        field_log marks as touched by batches logged since the last
+        refresh; writes that log no batch (see tools/batch.log_batch) need
+        full=True.
+        Returns the number of records re-copied (-1 for a full copy).
+        """
+        source = get_connection()
+        try:
+            # Read the watermark first: replaying a batch twice is harmless, missing one is not
+            seq = _latest_batch_seq(source)
+            version = schema_version(source, "sqlite")
+            # Without batch_log (see setup_tables) there are no deltas to replay
+            if not full and (self._schema_version != version or not _has_table(source, "batch_log")):
+                full = True
+            if full:
+                self._snapshot(source)
+                count = -1
+            else:
+                count = self._apply_deltas(source)
+            self._batch_seq = seq
+            self._schema_version = version
+        finally:
+            source.close()
+        logging.debug(f"[DEBUG] Working copy refreshed ({'full' if count < 0 else count} records)")
+        return count
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self._path and os.path.exists(self._path):
+            os.unlink(self._path)
+            self._path = None
+
+    def _snapshot(self, source) -> None:
+        if self.mode == "memory":
+            copy = sqlite3.connect(":memory:", check_same_thread=False)
+        else:
+            fd, path = tempfile.mkstemp(suffix=".db")
+            os.close(fd)
+            copy = sqlite3.connect(path)
+        source.backup(copy)
+        self._build_indexes(copy)
+
+        old_conn, old_path = self.conn, self._path
+        if self.mode == "memory":
+            self.conn = copy
+            self._path = None
+        else:
+            copy.close()
+            self._path = path
+            self.conn = self._open_mmap()
+        self.conn.execute("PRAGMA query_only = ON")
+
+        if old_conn is not None:
+            old_conn.close()
+        if old_path and os.path.exists(old_path):
+            os.unlink(old_path)
+
+    def _open_mmap(self):
+        conn = sqlite3.connect(f"file:{self._path}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        return conn
+
+    def _build_indexes(self, copy) -> None:
+        for spec in self.indexes:
+            table = spec["table"]
+            fields = spec["fields"]
+            name = f"wc_{table}_{'_'.join(fields)}"
+            copy.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(fields)})")
+        copy.commit()
+
+    def _apply_deltas(self, source) -> int:
+        if not _has_table(source, "batch_log"):
+            return 0
+        touched = source.execute(
+            "SELECT DISTINCT table_name, record_uuid FROM field_log "
+            "WHERE batch_id IN (SELECT batch_id FROM batch_log WHERE batch_seq > ?)",
+            (self._batch_seq,)
+        ).fetchall()
+        if not touched:
+            return 0
+
+        by_table: dict[str, list[str]] = {}
+        for table, uuid_val in touched:
+            by_table.setdefault(table, []).append(uuid_val)
+
+        writer = sqlite3.connect(self._path) if self.mode == "mmap" else self.conn
+        writer.execute("PRAGMA query_only = OFF")
+        try:
+            identifier = get_primary_identifier()
+            token_table = _has_table(source, "field_tokens") and _has_table(writer, "field_tokens")
+            for table, uuids in by_table.items():
+                _replace_rows(source, writer, table, f"{identifier} IN", uuids)
+                if token_table:
+                    _replace_rows(source, writer, "field_tokens",
+                                  "table_name = ? AND record_uuid IN", uuids, [table])
+            writer.commit()
+        finally:
+            if writer is self.conn:
+                writer.execute("PRAGMA query_only = ON")
+            else:
+                writer.close()
+        return len(touched)
+
+def open_working_copy(mode: Optional[str] = None, indexes: Optional[list] = None) -> WorkingCopy:
+    return WorkingCopy(mode, indexes)
+
+def _replace_rows(source, target, table: str, where_in: str, ids: list, extra_params=()) -> None:
+    # Deleted source rows simply do not come back
+    chunked_in(target.cursor(), "sqlite", f"DELETE FROM {table} WHERE {where_in}", ids, extra_params)
+    rows = chunked_in(source.cursor(), "sqlite", f"SELECT * FROM {table} WHERE {where_in}", ids, extra_params)
+    if rows:
+        marks = ", ".join(["?"] * len(rows[0]))
+        target.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+
+def _has_table(conn, table: str) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return row is not None
+
+def _latest_batch_seq(conn) -> int:
+    if not _has_table(conn, "batch_log"):
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(batch_seq), 0) FROM batch_log").fetchone()[0]
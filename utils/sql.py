@@ -0,0 +1,22 @@
+# utils/sql.py
+
+CHUNK = 500    # identifiers per IN (...) list
+
+def placeholder(db_type: str) -> str:
+    return "?" if db_type == "sqlite" else "%s"
+
+def chunked_in(cur, db_type: str, sql_prefix: str, ids, extra_params=()) -> list:
+    """
+    Run `<sql_prefix> (<ph>, ...)` once per CHUNK of `ids`, binding
+    `extra_params` before each chunk. Returns every row fetched (none
+    for statements that produce no result set).
+    """
+    ph = placeholder(db_type)
+    ids = list(ids)
+    rows: list = []
+    for start in range(0, len(ids), CHUNK):
+        chunk = ids[start:start + CHUNK]
+        cur.execute(f"{sql_prefix} ({', '.join([ph] * len(chunk))})", list(extra_params) + chunk)
+        if cur.description is not None:
+            rows.extend(cur.fetchall())
+    return rows
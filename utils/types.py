@@ -34,12 +34,14 @@ class SearchPackageFlat:
 
     @staticmethod
     def from_dict(d: Dict[str, Any]) -> "SearchPackageFlat":
+        if not isinstance(d, dict):
+            raise ValueError("SearchPackage must be an object")
         raw_filters = d.get("filters")
         if not isinstance(raw_filters, list):
             raise ValueError("SearchPackage must have a top-level 'filters': []")
         flist: List[FlatFilter] = []
         for idx, f in enumerate(raw_filters, start=1):
-            if "operator" not in f or "value" not in f:
+            if not isinstance(f, dict) or "operator" not in f or "value" not in f:
                 raise ValueError(f"Filter #{idx} missing 'operator' or 'value'")
             flist.append(FlatFilter(
                 table    = f.get("table", "*"),
@@ -55,7 +57,7 @@ class SearchPackageFlat:
         raw_group_logic = d.get("group_logic", [])
         glist: List[GroupLogic] = []
         for idx, gl in enumerate(raw_group_logic, start=1):
-            if "groups" not in gl or "logic" not in gl:
+            if not isinstance(gl, dict) or not isinstance(gl.get("groups"), list) or "logic" not in gl:
                 raise ValueError(f"group_logic #{idx} missing 'groups' or 'logic'")
             glist.append(GroupLogic(
                 groups = gl["groups"],
@@ -122,3 +124,61 @@ class BatchPackage:
       • a new “group name” → insert new records
     """
     groups: Dict[str, List[ChangeOp]]
+
+# --- report packages ---
+Aggregate = Literal["count", "count_distinct", "sum", "min", "max"]
+
+@dataclass
+class AggregateSpec:
+    op: Aggregate
+    field: str                  = "*"      # "*" ⇒ count rows
+    alias: Optional[str]        = None     # defaults to "<op>_<field>"
+
+@dataclass
+class FacetSpec:
+    field: str
+    top: int                    = 10       # top-N values by count
+
+@dataclass
+class ReportPackage:
+    """
+    Aggregations over the rows of one table whose identifier
+    matches the search package.
+    """
+    table: str
+    search: SearchPackageFlat
+    aggregates: List[AggregateSpec]             = field(default_factory=list)
+    group_by: Optional[str]                     = None
+    facets: List[FacetSpec]                     = field(default_factory=list)
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> "ReportPackage":
+        if not isinstance(d, dict) or not isinstance(d.get("table"), str):
+            raise ValueError("ReportPackage must have a top-level 'table'")
+
+        alist: List[AggregateSpec] = []
+        for idx, a in enumerate(d.get("aggregates", []), start=1):
+            if not isinstance(a, dict) or "op" not in a:
+                raise ValueError(f"Aggregate #{idx} missing 'op'")
+            alist.append(AggregateSpec(
+                op    = a["op"],
+                field = a.get("field", "*"),
+                alias = a.get("alias")
+            ))
+
+        flist: List[FacetSpec] = []
+        for idx, fc in enumerate(d.get("facets", []), start=1):
+            if not isinstance(fc, dict) or "field" not in fc:
+                raise ValueError(f"Facet #{idx} missing 'field'")
+            flist.append(FacetSpec(
+                field = fc["field"],
+                top   = fc.get("top", 10)
+            ))
+
+        return ReportPackage(
+            table      = d["table"],
+            search     = SearchPackageFlat.from_dict(d.get("search", {"filters": []})),
+            aggregates = alist,
+            group_by   = d.get("group_by"),
+            facets     = flist
+        )